@@ -15,12 +15,65 @@ Supported languages:
 These formatters integrate with the code runner and IDE features.
 """
 
+import functools
 import html
 import re
-from pygments import highlight
-from pygments.lexers import get_lexer_by_name, guess_lexer
-from pygments.formatters import HtmlFormatter
-from pygments.util import ClassNotFound
+
+
+_FENCE_RE = re.compile(r'(\w+)-(exec|template|error)\Z')
+
+# Pygments is imported on first use so loading the extension stays cheap
+_PYGMENTS = None
+
+
+def _pygments():
+    """Import Pygments on first call and return the pieces the formatter needs."""
+    global _PYGMENTS
+    if _PYGMENTS is None:
+        from pygments import highlight
+        from pygments.lexers import get_lexer_by_name, guess_lexer
+        from pygments.formatters import HtmlFormatter
+        from pygments.util import ClassNotFound
+        _PYGMENTS = (highlight, get_lexer_by_name, guess_lexer, HtmlFormatter, ClassNotFound)
+    return _PYGMENTS
+
+
+@functools.lru_cache(maxsize=32)
+def _get_lexer(name):
+    """Return a reusable lexer for a language name, or None if Pygments doesn't know it."""
+    _, get_lexer_by_name, _, _, ClassNotFound = _pygments()
+    try:
+        return get_lexer_by_name(name)
+    except ClassNotFound:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def _get_formatter():
+    """Return the shared HTML formatter used for every fence."""
+    HtmlFormatter = _pygments()[3]
+    # Configure formatter to not wrap in extra divs - we'll add our own wrapper
+    return HtmlFormatter(
+        noclasses=False,  # Use CSS classes instead of inline styles
+        nowrap=True,      # Don't wrap in <div class="highlight"><pre>...</pre></div>
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _highlight(source, base_lang):
+    """Return Pygments HTML for a block, reusing output for identical fences."""
+    highlight, _, guess_lexer, _, _ = _pygments()
+
+    # Get syntax highlighting from Pygments
+    lexer = _get_lexer(base_lang)
+    if lexer is None:
+        # Fallback to plain text if language not found
+        try:
+            lexer = guess_lexer(source)
+        except Exception:
+            lexer = _get_lexer('text')
+
+    return highlight(source, lexer, _get_formatter())
 
 
 def _extract_language_from_fence(language):
@@ -38,7 +91,7 @@ def _extract_language_from_fence(language):
     Returns:
         Tuple of (base_language, fence_type)
     """
-    match = re.match(r'(\w+)-(exec|template|error)$', language)
+    match = _FENCE_RE.match(language)
     if match:
         return match.group(1), match.group(2)
     return language, None
@@ -69,48 +122,41 @@ def _format_code_fence(source, language, css_class, options, md, **kwargs):
     id_value = kwargs.get('id_value', '')
     attrs = kwargs.get('attrs', {})
     
-    # Get syntax highlighting from Pygments
-    try:
-        lexer = get_lexer_by_name(base_lang)
-    except ClassNotFound:
-        # Fallback to plain text if language not found
-        try:
-            lexer = guess_lexer(source)
-        except Exception:
-            lexer = get_lexer_by_name('text')
-    
     # Use Pygments to highlight the code
-    # Configure formatter to not wrap in extra divs - we'll add our own wrapper
-    formatter = HtmlFormatter(
-        noclasses=False,  # Use CSS classes instead of inline styles
-        nowrap=True,      # Don't wrap in <div class="highlight"><pre>...</pre></div>
-    )
-    highlighted_code = highlight(source, lexer, formatter)
+    highlighted_code = _highlight(source, base_lang)
     
     # Build class list for outer container
     class_list = ['highlight', css_class]
     if classes:
         class_list.extend(classes)
-    
+    class_str = ' '.join(class_list)
+
+    # Escape values once and reuse them below
+    base_lang_esc = html.escape(base_lang)
+
     # Build data attributes for the code runner
     data_attrs = [
         f'data-fence-type="{fence_type}"',
-        f'data-language="{html.escape(base_lang)}"'
+        f'data-language="{base_lang_esc}"'
     ]
-    
+
     # Add any custom attributes from the fence header
+    # Keys are attribute identifiers parsed by SuperFences, so only values need escaping
     for key, value in attrs.items():
-        data_attrs.append(f'data-{html.escape(key)}="{html.escape(str(value))}"')
-    
+        data_attrs.append(f'data-{key}="{html.escape(str(value))}"')
+    data_attr_str = ' '.join(data_attrs)
+
     # Add id if present
     id_attr = f' id="{html.escape(id_value)}"' if id_value else ''
-    
+
     # Build the complete HTML structure
     # Wrap highlighted code in <pre><code> with our custom attributes on the container div
-    html_output = f'''<div class="{' '.join(class_list)}" {' '.join(data_attrs)}{id_attr}>
-<pre><code class="language-{html.escape(base_lang)}">{highlighted_code}</code></pre>
-</div>'''
-    
+    html_output = (
+        f'<div class="{class_str}" {data_attr_str}{id_attr}>\n'
+        f'<pre><code class="language-{base_lang_esc}">{highlighted_code}</code></pre>\n'
+        f'</div>'
+    )
+
     return html_output
 
 
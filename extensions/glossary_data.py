@@ -0,0 +1,35 @@
+"""
+Shared access to the glossary TOML file.
+
+Both the glossary Markdown extension and the glossary macros read
+docs/glossary.toml. Parsing it once per file version keeps serve rebuilds
+from re-reading the same data in each place.
+"""
+
+import functools
+from pathlib import Path
+from typing import Tuple, Union
+
+try:
+    import tomllib as tomli  # Python 3.11+
+except ImportError:  # pragma: no cover - fallback for older Python
+    import tomli  # type: ignore[import-any]
+
+
+def load_glossary_terms(config_path: Union[str, Path]) -> Tuple[dict, ...]:
+    """
+    Return the ``[[term]]`` tables from a glossary TOML file.
+
+    The parsed result is cached on the resolved path and modification time,
+    so the file is only read again after it changes. Callers share the
+    returned dicts and must not modify them.
+    """
+    path = Path(config_path).resolve()
+    return _load_terms(str(path), path.stat().st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_terms(path: str, mtime_ns: int) -> Tuple[dict, ...]:
+    with open(path, 'rb') as f:
+        data = tomli.load(f)
+    return tuple(data.get('term', []))
@@ -6,18 +6,21 @@ Respects page-level opt-out via frontmatter and excludes code blocks.
 """
 
 import re
+import sys
 import xml.etree.ElementTree as etree
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 try:
-    import tomllib as tomli  # Python 3.11+
-except ImportError:  # pragma: no cover - fallback for older Python
-    import tomli  # type: ignore[import-any]
+    import ahocorasick  # C extension for linear-time multi-term search
+except ImportError:  # pragma: no cover - missing wheel falls back to the regex scanner
+    ahocorasick = None
 
 from markdown import Extension
 from markdown.treeprocessors import Treeprocessor
 
+from extensions.glossary_data import load_glossary_terms
+
 
 class GlossaryConfig:
     """Loads and caches glossary configuration from TOML file."""
@@ -25,12 +28,19 @@ class GlossaryConfig:
     _instance = None
     _terms: Dict[str, dict] = {}
     _pattern_str = None
+    _regex = None
+    _lower_regex = None
+    _ascii_regex = None
+    _automaton = None
+    _prefilter = None
+    _loaded_terms = None
     
     def __new__(cls, config_path: Optional[str] = None):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
-            if config_path:
-                cls._instance.load(config_path)
+        if config_path:
+            # load() returns early unless the glossary file changed
+            cls._instance.load(config_path)
         return cls._instance
     
     def load(self, config_path: str):
@@ -39,33 +49,71 @@ class GlossaryConfig:
         if not path.exists():
             print(f"⚠️  Glossary config not found: {config_path}")
             return
-        
-        with open(path, 'rb') as f:
-            data = tomli.load(f)
+
+        # Markdown builds a new extension per page. load_glossary_terms returns
+        # the same cached tuple until the file changes, so skip the rebuild then
+        terms = load_glossary_terms(path)
+        if terms is self._loaded_terms:
+            return
         
         # Build term dictionary with all variants (canonical + aliases)
         term_map = {}
-        for term_data in data.get('term', []):
-            canonical = term_data['name']
+        for term_data in terms:
+            # Category names repeat across many terms; interning them (and the
+            # canonical name) keeps one copy of each attribute value
+            canonical = sys.intern(term_data['name'])
             term_map[canonical.lower()] = {
                 'canonical': canonical,
                 'definition': term_data['definition'],
-                'category': term_data.get('category', ''),
+                # Definitions are static, so escape them once here rather than per hit
+                'definition_escaped': self._escape_attr(term_data['definition']),
+                'category': sys.intern(term_data.get('category', '')),
                 'full_form': term_data.get('full_form', '')
             }
+            term_map[canonical.lower()]['span_attrib'] = self._make_span_attrib(term_map[canonical.lower()])
             
             # Add aliases
             for alias in term_data.get('aliases', []):
                 term_map[alias.lower()] = term_map[canonical.lower()]
         
+        # The patterns only depend on the term keys, so keep them if those are unchanged
+        rebuild = term_map.keys() != self._terms.keys()
         self._terms = term_map
-        self._build_pattern()
-        print(f"✓ Glossary loaded: {len(data.get('term', []))} terms, {len(term_map)} total variants")
+        if rebuild:
+            self._build_pattern()
+        self._loaded_terms = terms
+        print(f"✓ Glossary loaded: {len(terms)} terms, {len(term_map)} total variants")
     
+    @staticmethod
+    def _escape_attr(text: str) -> str:
+        return text.replace('"', '&quot;').replace("'", '&#39;')
+
+    @staticmethod
+    def _make_span_attrib(term_data: Dict[str, str]) -> Dict[str, str]:
+        """Build the tooltip span attributes for a term once, in serialisation order."""
+        attrib = {
+            'class': 'glossary-term',
+            'data-glossary-term': term_data['canonical'],
+            'data-glossary-definition': term_data['definition_escaped'],
+        }
+
+        if term_data.get('category'):
+            attrib['data-glossary-category'] = term_data['category']
+
+        if term_data.get('full_form'):
+            attrib['data-glossary-full-form'] = term_data['full_form']
+
+        return attrib
+
     def _build_pattern(self):
         """Build regex pattern for efficient term matching."""
         if not self._terms:
             self._pattern_str = None
+            self._regex = None
+            self._lower_regex = None
+            self._ascii_regex = None
+            self._automaton = None
+            self._prefilter = None
             return
         
         # Sort by length (longest first) to match "Web API" before "API"
@@ -74,6 +122,24 @@ class GlossaryConfig:
         escaped = [re.escape(term) for term in terms]
         # Word boundary pattern
         self._pattern_str = r'\b(' + '|'.join(escaped) + r')\b'
+        self._regex = re.compile(self._pattern_str, re.IGNORECASE)
+        # Terms are stored lowercased, so already-lowercased text needs no case folding;
+        # pure-ASCII text can also skip Unicode word-boundary tables
+        self._lower_regex = re.compile(self._pattern_str)
+        self._ascii_regex = re.compile(self._pattern_str, re.ASCII)
+
+        # Every match has to start with one of these characters, so text without
+        # any of them can be rejected before the full search runs
+        first_chars = ''.join(sorted({term[0] for term in terms}))
+        self._prefilter = re.compile('[' + re.escape(first_chars) + ']', re.IGNORECASE)
+
+        # Aho-Corasick automaton over the same (lowercased) terms when available
+        if ahocorasick is not None:
+            automaton = ahocorasick.Automaton()
+            for term in terms:
+                automaton.add_word(term, term)
+            automaton.make_automaton()
+            self._automaton = automaton
     
     @property
     def terms(self) -> Dict[str, dict]:
@@ -83,12 +149,43 @@ class GlossaryConfig:
     def pattern(self):
         return self._pattern_str
 
+    @property
+    def regex(self):
+        return self._regex
+
+    @property
+    def lower_regex(self):
+        return self._lower_regex
+
+    @property
+    def ascii_regex(self):
+        return self._ascii_regex
+
+    @property
+    def automaton(self):
+        return self._automaton
+
+    @property
+    def prefilter(self):
+        return self._prefilter
+
+
+def _is_word_boundary(text: str, index: int) -> bool:
+    """Return True if ``index`` sits on a regex ``\\b`` boundary in ``text``."""
+    before = index > 0 and (text[index - 1].isalnum() or text[index - 1] == '_')
+    after = index < len(text) and (text[index].isalnum() or text[index] == '_')
+    return before != after
+
 
 class GlossaryTreeprocessor(Treeprocessor):
     """Treeprocessor that wraps glossary terms while skipping code/diagram blocks."""
 
-    _SKIP_TAGS = {"code", "pre", "kbd", "samp", "script", "style", "svg", "h1", "title"}
-    _SKIP_CLASS_KEYS = {
+    # Checked against every element in the tree; interned frozensets keep the
+    # membership tests to a cached hash and a pointer comparison
+    _SKIP_TAGS = frozenset(map(sys.intern, (
+        "code", "pre", "kbd", "samp", "script", "style", "svg", "h1", "title"
+    )))
+    _SKIP_CLASS_KEYS = frozenset(map(sys.intern, (
         "glossary-term",
         "no-glossary",
         "diagram-content",
@@ -97,15 +194,21 @@ class GlossaryTreeprocessor(Treeprocessor):
         "md-nav__title",
         "md-nav__link",
         "md-nav__list"
-    }
-    _SKIP_CLASS_PREFIXES = {"highlight", "language-", "codehilite"}
+    )))
+    # Tuple so a single str.startswith call checks every prefix
+    _SKIP_CLASS_PREFIXES = ("highlight", "language-", "codehilite")
 
     def __init__(self, md, glossary_config: GlossaryConfig, config: Dict[str, Union[str, bool]]):
         super().__init__(md)
         self.glossary_config = glossary_config
         self.enabled = config.get('enabled', True)
         self.pattern_str = glossary_config.pattern
-        self.pattern = re.compile(self.pattern_str, re.IGNORECASE) if self.pattern_str else None
+        # Compiled once on the shared config rather than per Markdown instance
+        self.pattern = glossary_config.regex
+        self.lower_pattern = glossary_config.lower_regex
+        self.ascii_pattern = glossary_config.ascii_regex
+        self.automaton = glossary_config.automaton
+        self.prefilter = glossary_config.prefilter
         self.config = config
 
     def run(self, root):
@@ -119,182 +222,182 @@ class GlossaryTreeprocessor(Treeprocessor):
             if meta_glossary and meta_glossary[0] == 'false':
                 return
 
-        self._process_element(root, parent=None, in_code_block=False)
-
-    def _process_element(self, element, parent, in_code_block):
-        # Check if this element is a code block or we're already inside one
-        is_code_element = self._is_code_block(element)
-        in_code = in_code_block or is_code_element
-        
-        if self._should_skip_element(element, in_code):
-            return
-
-        # Process element text only if not in code block
-        if not in_code:
-            self._process_text_node(element, parent, is_text=True)
-
-        # Recursively process children
-        for child in list(element):
-            self._process_element(child, parent=element, in_code_block=in_code)
-            # Process tail text after child only if not in code block
-            if not in_code:
-                self._process_text_node(child, parent=element, is_text=False)
-    
-    def _is_code_block(self, element) -> bool:
-        """Check if element is a code block (pre, code, or has code-related attributes)."""
-        tag = element.tag.lower() if hasattr(element.tag, 'lower') else element.tag
-        
-        # Direct code/pre tags
-        if tag in {'code', 'pre', 'kbd', 'samp'}:
-            return True
-        
-        # Divs with code-related classes (fenced code blocks)
-        classes = element.get('class') or ''
-        if classes:
-            class_list = classes.split()
-            # Any class starting with 'highlight', 'language-', 'codehilite'
-            if any(cls.startswith(('highlight', 'language-', 'codehilite')) for cls in class_list):
-                return True
-        
-        return False
-
-    def _should_skip_element(self, element, in_code_block) -> bool:
-        """Determine if element should be skipped for glossary processing."""
-        # Skip if we're in a code block
-        if in_code_block:
-            return True
-        
-        tag = element.tag.lower() if hasattr(element.tag, 'lower') else element.tag
+        self._process_element(root, parent=None)
+
+    def _process_element(self, element, parent):
+        # Walk the tree with an explicit stack rather than recursion so deep
+        # nesting (lists in admonitions in tabs) costs no Python frames
+        prefilter = self.prefilter
+        stack = [(element, parent)]
+        while stack:
+            element, parent = stack.pop()
+
+            # Skipped elements (code blocks included) are never entered, so nothing
+            # below this point can be inside code
+            if self._should_skip_element(element):
+                continue
+
+            # Only hand text to the matcher when it could contain a term
+            text = element.text
+            if text and prefilter.search(text):
+                self._process_text_node(element, parent, is_text=True)
+
+            # Leaf elements have no children or tails to visit
+            if not len(element):
+                continue
+
+            children = list(element)
+            # Spans inserted after earlier tails shift later children along
+            inserted = 0
+            for position, child in enumerate(children):
+                # Tail text after a child belongs to this element, even when the child is skipped
+                tail = child.tail
+                if tail and prefilter.search(tail):
+                    inserted += self._process_text_node(
+                        child, parent=element, is_text=False, index=position + inserted
+                    )
+
+            # Reversed so children are popped in document order
+            stack.extend((child, element) for child in reversed(children))
+
+    def _should_skip_element(self, element) -> bool:
+        """Determine if element should be skipped for glossary processing.
+
+        Covers code blocks (code/pre/kbd/samp tags and highlight/language-/codehilite
+        classes) as well as diagrams, navigation and explicit opt-outs, reading the
+        tag and class attribute once.
+        """
+        tag = element.tag
+        if isinstance(tag, str):
+            tag = tag.lower()
         if tag in self._SKIP_TAGS:
             return True
 
-        classes = element.get('class') or ''
+        classes = element.get('class')
         if classes:
-            class_list = classes.split()
-            # Check exact matches
-            if any(cls in self._SKIP_CLASS_KEYS for cls in class_list):
-                return True
-            # Check prefixes for code-related classes
-            if any(cls.startswith(prefix) for cls in class_list for prefix in self._SKIP_CLASS_PREFIXES):
-                return True
-
-        if element.get('data-glossary-skip') == 'true':
-            return True
+            for cls in classes.split():
+                if cls in self._SKIP_CLASS_KEYS or cls.startswith(self._SKIP_CLASS_PREFIXES):
+                    return True
 
-        return False
+        return element.get('data-glossary-skip') == 'true'
 
-    def _process_text_node(self, element, parent, is_text: bool):
+    def _process_text_node(self, element, parent, is_text: bool, index: Optional[int] = None) -> int:
+        """Wrap glossary terms in an element's text or tail; returns the number of spans added.
+
+        ``index`` is the element's position in ``parent`` when the caller already knows it.
+        """
         pattern = self.pattern
         if pattern is None:
-            return
+            return 0
 
+        # Callers only pass text that has already passed the prefilter
         text = element.text if is_text else element.tail
-        if not text:
-            return
 
-        matches = list(pattern.finditer(text))
-        if not matches:
-            return
+        # Lowercase once; the slices double as term_map keys
+        lower_text = text.lower()
+        same_length = len(lower_text) == len(text)
+        spans = self._find_matches(text, lower_text)
+        if not spans:
+            return 0
 
+        # Text between spans is sliced as one run, so parts never holds two strings
+        # in a row and each text/tail only needs assigning once
         parts: List[Union[str, etree.Element]] = []
+        added = 0
         last_index = 0
-        for match in matches:
-            start, end = match.start(), match.end()
-            if start > last_index:
-                parts.append(text[last_index:start])
-
-            term = match.group(0)
-            term_data = self.glossary_config.terms.get(term.lower())
+        for start, end in spans:
+            term = text[start:end]
+            key = lower_text[start:end] if same_length else term.lower()
+            term_data = self.glossary_config.terms.get(key)
             if not term_data:
-                parts.append(term)
-            else:
-                parts.append(self._build_span(term, term_data))
+                continue
 
+            if start > last_index:
+                parts.append(text[last_index:start])
+            parts.append(self._build_span(term, term_data))
+            added += 1
             last_index = end
 
+        if not added:
+            return 0
+
         if last_index < len(text):
             parts.append(text[last_index:])
 
         if is_text:
             self._apply_to_text(element, parts)
         else:
-            self._apply_to_tail(element, parent, parts)
+            self._apply_to_tail(element, parent, parts, index)
+        return added
+
+    def _find_matches(self, text: str, lower_text: str) -> List[Tuple[int, int]]:
+        """Return (start, end) spans of glossary terms, matching the regex's leftmost-longest choice."""
+        # Lowercasing a few Unicode characters changes the length; fold case in the regex for those
+        if len(lower_text) != len(text):
+            return [match.span() for match in self.pattern.finditer(text)]
+        if self.automaton is None:
+            pattern = self.ascii_pattern if text.isascii() else self.lower_pattern
+            return [match.span() for match in pattern.finditer(lower_text)]
+
+        # Keep the longest bounded term starting at each position
+        longest: Dict[int, int] = {}
+        for end_index, key in self.automaton.iter(lower_text):
+            end = end_index + 1
+            start = end - len(key)
+            if end > longest.get(start, -1) and _is_word_boundary(text, start) and _is_word_boundary(text, end):
+                longest[start] = end
+
+        # Scan left to right without overlaps, as re.finditer would
+        spans: List[Tuple[int, int]] = []
+        last_end = 0
+        for start in sorted(longest):
+            if start >= last_end:
+                spans.append((start, longest[start]))
+                last_end = longest[start]
+        return spans
 
     def _apply_to_text(self, element, parts: List[Union[str, etree.Element]]):
         if not parts:
             return
 
-        iterator = iter(parts)
-        first = next(iterator)
-
-        if isinstance(first, str):
-            element.text = first
-            prev_elem: Optional[etree.Element] = None
-        else:
-            element.text = ''
-            element.insert(0, first)
-            prev_elem = first
-
-        for part in iterator:
+        # New spans go before any existing children, in order
+        element.text = ''
+        insert_index = 0
+        prev_elem: Optional[etree.Element] = None
+        for part in parts:
             if isinstance(part, str):
                 if prev_elem is None:
-                    element.text = (element.text or '') + part
+                    element.text = part
                 else:
-                    prev_elem.tail = (prev_elem.tail or '') + part
+                    prev_elem.tail = part
             else:
-                insert_index = list(element).index(prev_elem) + 1 if prev_elem is not None else len(element)
                 element.insert(insert_index, part)
+                insert_index += 1
                 prev_elem = part
 
-    def _apply_to_tail(self, element, parent, parts: List[Union[str, etree.Element]]):
+    def _apply_to_tail(self, element, parent, parts: List[Union[str, etree.Element]], index: Optional[int] = None):
         if parent is None or not parts:
             return
 
-        iterator = iter(parts)
-        first = next(iterator)
-
-        if isinstance(first, str):
-            element.tail = first
-            prev_elem: Union[etree.Element, str] = 'SENTINEL'
-        else:
-            element.tail = ''
-            insert_index = list(parent).index(element) + 1
-            parent.insert(insert_index, first)
-            prev_elem = first
-
-        for part in iterator:
+        # New spans go directly after the element, in order; text before the
+        # first span stays in the element's own tail
+        element.tail = ''
+        insert_index = (index if index is not None else list(parent).index(element)) + 1
+        prev_elem = element
+        for part in parts:
             if isinstance(part, str):
-                if isinstance(prev_elem, etree.Element):
-                    prev_elem.tail = (prev_elem.tail or '') + part
-                else:
-                    element.tail = (element.tail or '') + part
+                prev_elem.tail = part
             else:
-                if isinstance(prev_elem, etree.Element):
-                    insert_index = list(parent).index(prev_elem) + 1
-                else:
-                    insert_index = list(parent).index(element) + 1
                 parent.insert(insert_index, part)
+                insert_index += 1
                 prev_elem = part
 
     def _build_span(self, term: str, term_data: Dict[str, str]) -> etree.Element:
-        span = etree.Element('span')
-        span.set('class', 'glossary-term')
-        span.set('data-glossary-term', term_data['canonical'])
-        span.set('data-glossary-definition', self._escape_attr(term_data['definition']))
-
-        if term_data.get('category'):
-            span.set('data-glossary-category', term_data['category'])
-
-        if term_data.get('full_form'):
-            span.set('data-glossary-full-form', term_data['full_form'])
-
+        # Element() copies the prebuilt attribute dict, so spans never share attributes
+        span = etree.Element('span', term_data['span_attrib'])
         span.text = term
         return span
 
-    @staticmethod
-    def _escape_attr(text: str) -> str:
-        return text.replace('"', '&quot;').replace("'", '&#39;')
-
 
 class GlossaryExtension(Extension):
     """MkDocs extension for glossary auto-linking."""
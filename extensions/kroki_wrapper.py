@@ -6,11 +6,44 @@ and wraps them with the diagram container for modal functionality.
 from __future__ import annotations
 
 import re
-from typing import Match
 
 from markdown.postprocessors import Postprocessor
 from markdown.extensions import Extension
 
+# Find SVGs that look like Kroki diagrams (both PlantUML and Mermaid)
+# Pattern matches: <p><svg ...>...</svg></p> or just <svg ...>...</svg>
+KROKI_SVG_RE = re.compile(
+    r'<p>(\s*<svg[^>]*>.*?</svg>\s*)</p>',
+    re.DOTALL | re.IGNORECASE
+)
+
+# Cheap pre-check for any <svg tag, matching KROKI_SVG_RE's case-insensitivity
+SVG_TAG_RE = re.compile(r'<svg', re.IGNORECASE)
+
+# Present in the markup just before an SVG this postprocessor already wrapped
+CONTAINER_MARKER = 'class="diagram-container"'
+
+# Container markup is constant apart from the ids and the SVG itself
+WRAPPER_TEMPLATE = (
+    '<div class="diagram-container" data-container-id="{diagram_id}">'
+    '<button class="diagram-expand-btn" onclick="openDiagramModal(\'{diagram_id}\')">🔍 View Larger</button>'
+    '<div id="{diagram_id}" class="diagram-content">'
+    '<p>{svg}</p>'
+    '</div>'
+    '</div>'
+)
+
+
+def _inject_diagram_id(svg_content: str, svg_id: str) -> str:
+    """Add a data-diagram-id attribute to the end of the first <svg ...> opening tag."""
+    tag_start = svg_content.find('<svg')
+    if tag_start == -1:
+        return svg_content
+    tag_end = svg_content.find('>', tag_start)
+    if tag_end == -1:
+        tag_end = len(svg_content)
+    return f'{svg_content[:tag_end]} data-diagram-id="{svg_id}"{svg_content[tag_end:]}'
+
 
 class KrokiWrapperPostprocessor(Postprocessor):
     def __init__(self, md, start_id: int = 0):
@@ -18,51 +51,41 @@ class KrokiWrapperPostprocessor(Postprocessor):
         self.counter = start_id
 
     def run(self, text: str) -> str:
-        # Find SVGs that look like Kroki diagrams (both PlantUML and Mermaid)
-        # Pattern matches: <p><svg ...>...</svg></p> or just <svg ...>...</svg>
-        # Look for SVG tags that might be from Kroki/Mermaid
-        pattern = re.compile(
-            r'<p>(\s*<svg[^>]*>.*?</svg>\s*)</p>',
-            re.DOTALL | re.IGNORECASE
-        )
-
-        def replace_kroki_svg(match: Match) -> str:
+        # Most pages have no inline SVG; a literal scan skips the full regex
+        if not SVG_TAG_RE.search(text):
+            return text
+
+        out_parts = []
+        last_end = 0
+
+        for match in KROKI_SVG_RE.finditer(text):
+            start = match.start()
             svg_content = match.group(1).strip()
-            
+
             # Skip if this SVG is not from a diagram (heuristic: check for substantial content)
             if len(svg_content) < 100:
-                return match.group(0)
-            
+                continue
+
             # Check if already wrapped (idempotent)
-            start_pos = max(0, match.start() - 200)
-            before_context = text[start_pos:match.start()]
-            if 'class="diagram-container"' in before_context.lower():
-                return match.group(0)  # Return original if already wrapped
-            
+            if CONTAINER_MARKER in text[max(0, start - 200):start].lower():
+                continue
+
             # Use kroki-diagram prefix to avoid collision with JS-generated IDs
             diagram_id = f"kroki-diagram-{self.counter}"
             svg_id = f"kroki-svg-{self.counter}"
             self.counter += 1
 
             # Inject a data-diagram-id attribute into the SVG for reliable tracking
-            svg_with_id = re.sub(
-                r'(<svg[^>]*)',
-                rf'\1 data-diagram-id="{svg_id}"',
-                svg_content,
-                count=1
-            )
-
-            wrapped = (
-                f'<div class="diagram-container" data-container-id="{diagram_id}">'
-                f'<button class="diagram-expand-btn" onclick="openDiagramModal(\'{diagram_id}\')">🔍 View Larger</button>'
-                f'<div id="{diagram_id}" class="diagram-content">'
-                f'<p>{svg_with_id}</p>'
-                f'</div>'
-                f'</div>'
-            )
-            return wrapped
-
-        return pattern.sub(replace_kroki_svg, text)
+            svg_with_id = _inject_diagram_id(svg_content, svg_id)
+
+            out_parts.append(text[last_end:start])
+            out_parts.append(WRAPPER_TEMPLATE.format(diagram_id=diagram_id, svg=svg_with_id))
+            last_end = match.end()
+
+        if not out_parts:
+            return text
+        out_parts.append(text[last_end:])
+        return ''.join(out_parts)
 
 
 class KrokiWrapperExtension(Extension):
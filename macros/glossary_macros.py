@@ -3,11 +3,13 @@ Glossary page generator for MkDocs macros plugin.
 Generates the glossary page with alphabetical sorting and category filtering.
 """
 
+import html
+import io
+import json
+from collections import defaultdict
 from pathlib import Path
-try:
-    import tomllib as tomli  # Python 3.11+
-except ImportError:
-    import tomli  # Fallback for older Python
+
+from extensions.glossary_data import load_glossary_terms
 
 
 def define_env(env):
@@ -21,10 +23,7 @@ def define_env(env):
         if not config_path.exists():
             return "<!-- Glossary config not found -->"
         
-        with open(config_path, 'rb') as f:
-            data = tomli.load(f)
-        
-        terms = data.get('term', [])
+        terms = load_glossary_terms(config_path)
         if not terms:
             return "<!-- No glossary terms defined -->"
         
@@ -32,71 +31,75 @@ def define_env(env):
         terms_sorted = sorted(terms, key=lambda t: t['name'].lower())
         
         # Group by first letter
-        by_letter = {}
+        by_letter = defaultdict(list)
         for term in terms_sorted:
-            letter = term['name'][0].upper()
-            if letter not in by_letter:
-                by_letter[letter] = []
-            by_letter[letter].append(term)
+            by_letter[term['name'][0].upper()].append(term)
         
-        # Get all categories for filter UI
+        # Get all categories for filter UI, with their escaped ids and labels
         categories = sorted(set(t.get('category', '') for t in terms if t.get('category')))
+        category_html = {
+            cat: (html.escape(cat.lower().replace(' ', '-')), html.escape(cat, quote=False))
+            for cat in categories
+        }
         
         # Build HTML
-        html_parts = []
+        buf = io.StringIO()
+        w = buf.write
         
         # Category filter UI
         if categories:
-            html_parts.append('<div class="glossary-filters">')
-            html_parts.append('  <div class="glossary-categories">')
-            html_parts.append('    <span class="filter-label">Filter by category:</span>')
-            html_parts.append('    <button class="category-filter-btn active" data-category="all">All</button>')
-            for cat in categories:
-                cat_id = cat.lower().replace(' ', '-')
-                html_parts.append(
-                    f'    <button class="category-filter-btn" data-category="{cat_id}">{cat}</button>'
-                )
-            html_parts.append('  </div>')
-            html_parts.append('</div>')
-            html_parts.append('')
+            w('<div class="glossary-filters">\n')
+            w('  <div class="glossary-categories">\n')
+            w('    <span class="filter-label">Filter by category:</span>\n')
+            w('    <button class="category-filter-btn active" data-category="all">All</button>\n')
+            for cat_id, cat_label in category_html.values():
+                w(f'    <button class="category-filter-btn" data-category="{cat_id}">{cat_label}</button>\n')
+            w('  </div>\n')
+            w('</div>\n')
+            w('\n')
         
-        # Terms by letter
-        for letter in sorted(by_letter.keys()):
-            html_parts.append(f'<div class="glossary-section" data-letter="{letter}">')
-            html_parts.append(f'  <h2 id="{letter}" class="glossary-letter-heading">')
-            html_parts.append(f'    {letter}')
-            html_parts.append(f'    <a class="headerlink" href="#{letter}" title="Permanent link">¶</a>')
-            html_parts.append('  </h2>')
+        # Terms by letter, separated by blank lines
+        for index, letter in enumerate(sorted(by_letter.keys())):
+            if index:
+                w('\n')
+            w(f'<div class="glossary-section" data-letter="{letter}">\n')
+            w(f'  <h2 id="{letter}" class="glossary-letter-heading">\n')
+            w(f'    {letter}\n')
+            w(f'    <a class="headerlink" href="#{letter}" title="Permanent link">¶</a>\n')
+            w('  </h2>\n')
             
             for term in by_letter[letter]:
-                term_id = term['name'].lower().replace(' ', '-')
+                # Glossary fields are plain text, so escape them before interpolating
+                name = term['name']
+                term_id = html.escape(name.lower().replace(' ', '-'))
                 category = term.get('category', '')
-                cat_class = f' data-term-category="{category.lower().replace(" ", "-")}"' if category else ''
                 
-                html_parts.append(f'  <div class="glossary-entry"{cat_class}>')
-                html_parts.append(f'    <h3 id="{term_id}">')
-                html_parts.append(f'      {term["name"]}')
-                html_parts.append(f'      <a class="headerlink" href="#{term_id}" title="Permanent link">¶</a>')
-                html_parts.append('    </h3>')
+                if category:
+                    cat_id, cat_label = category_html[category]
+                    w(f'  <div class="glossary-entry" data-term-category="{cat_id}">\n')
+                else:
+                    w('  <div class="glossary-entry">\n')
+                w(f'    <h3 id="{term_id}">\n')
+                w(f'      {html.escape(name, quote=False)}\n')
+                w(f'      <a class="headerlink" href="#{term_id}" title="Permanent link">¶</a>\n')
+                w('    </h3>\n')
                 
                 # Full form for acronyms
                 if term.get('full_form'):
-                    html_parts.append(f'    <p class="glossary-full-form"><em>{term["full_form"]}</em></p>')
+                    w(f'    <p class="glossary-full-form"><em>{html.escape(term["full_form"], quote=False)}</em></p>\n')
                 
                 # Definition
-                html_parts.append(f'    <p class="glossary-definition">{term["definition"]}</p>')
+                w(f'    <p class="glossary-definition">{html.escape(term["definition"], quote=False)}</p>\n')
                 
                 # Category pill (clickable to filter)
                 if category:
-                    cat_id = category.lower().replace(' ', '-')
-                    html_parts.append(f'    <a href="?category={cat_id}" class="term-category-pill" data-category="{cat_id}">{category}</a>')
+                    w(f'    <a href="?category={cat_id}" class="term-category-pill" data-category="{cat_id}">{cat_label}</a>\n')
                 
-                html_parts.append('  </div>')
+                w('  </div>\n')
             
-            html_parts.append('</div>')
-            html_parts.append('')
+            w('</div>\n')
         
-        return '\n'.join(html_parts)
+        return buf.getvalue()
     
     @env.macro
     def glossary_data_json():
@@ -106,10 +109,6 @@ def define_env(env):
         if not config_path.exists():
             return '{}'
         
-        with open(config_path, 'rb') as f:
-            data = tomli.load(f)
-        
-        terms = data.get('term', [])
+        terms = load_glossary_terms(config_path)
         # Return JSON string for embedding in JavaScript
-        import json
         return json.dumps(terms, indent=2)
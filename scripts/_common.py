@@ -0,0 +1,25 @@
+"""Helpers shared by the markdown maintenance scripts in this directory.
+
+The scripts are run directly (python scripts/<name>.py), so scripts/ is on
+sys.path and they import this module as ``_common``.
+"""
+import os
+import re
+from pathlib import Path
+
+# Line patterns used by both the quality checker and the fixer
+H1_RE = re.compile(r'^#\s')
+LIST_ITEM_RE = re.compile(r'^([-*+]\s|\d+\.\s)')
+
+
+def iter_markdown_files(root: Path):
+    """Yield every .md file under root, using scandir and skipping .git."""
+    stack = [str(root)]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name != '.git':
+                        stack.append(entry.path)
+                elif entry.name.endswith('.md'):
+                    yield Path(entry.path)
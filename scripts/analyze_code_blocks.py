@@ -10,98 +10,167 @@ Analyzes Python code blocks in index.md files and updates their fence types:
 This script now processes ALL Python code blocks (python, python-exec, python-template)
 and re-evaluates their classification. Code blocks are executed with a 2-second timeout.
 Blocks with input() calls that complete before timeout are classified as python-exec if they produce output.
+Files left unchanged since the last run (tracked in .cache/analyze_code_blocks.json) are skipped.
 
 Usage: python scripts/analyze_code_blocks.py
 """
 
 import ast
+import hashlib
 import io
+import json
+import os
+import re
+import signal
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from contextlib import redirect_stdout
-from multiprocessing import Process, Queue
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Connection, wait
 from typing import List, Tuple, Optional
 import sys
 from pathlib import Path
 
+from _common import iter_markdown_files
+
+
+# A ```python... opening fence line, then every following line up to the next
+# line starting with ``` (group "close"), which must be a bare ``` to end the block
+PYTHON_BLOCK_RE = re.compile(
+    r'^[^\S\n]*```(?P<fence>python[^\n]*)$'
+    r'(?P<body>(?:\n(?![^\S\n]*```)[^\n]*)*)'
+    r'(?:\n(?P<close>[^\S\n]*```[^\n]*))?',
+    re.MULTILINE,
+)
+
+
+# Signatures of files processed by the last run, relative to the repo root
+RUN_CACHE_PATH = Path(".cache") / "analyze_code_blocks.json"
+
 
 def find_python_code_blocks(content: str) -> List[Tuple[int, int, str, str]]:
     """
     Find all Python code blocks in markdown content.
 
-    Returns list of (start_line, end_line, code, current_fence_type) tuples.
+    Returns list of (start_line, end_line, code, current_fence_type) tuples,
+    where the line numbers are indices into content.split('\n').
     Now processes ALL Python blocks (python, python-exec, python-template).
     """
     blocks = []
-    lines = content.split('\n')
+    line_no = 0
+    pos = 0
 
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
+    for match in PYTHON_BLOCK_RE.finditer(content):
+        close = match.group('close')
+        if close is None or close.strip() != '```':
+            continue
+        line_no += content.count('\n', pos, match.start())
+        pos = match.start()
+        body = match.group('body')
+        end_line = line_no + body.count('\n') + 1
+        blocks.append((line_no, end_line, body[1:], match.group('fence').rstrip()))
 
-        # Look for opening ```python (any variant)
-        if line.startswith('```python'):
-            fence_type = line[3:]  # Extract full fence type (e.g., "python-exec")
-            start_line = i
-            code_lines = []
-            i += 1
+    return blocks
 
-            # Collect code until closing ```
-            while i < len(lines) and not lines[i].strip().startswith('```'):
-                code_lines.append(lines[i])
-                i += 1
 
-            if i < len(lines) and lines[i].strip() == '```':
-                code = '\n'.join(code_lines)
-                blocks.append((start_line, i, code, fence_type))
+# Flags found by walking every node (the rest only look at top-level statements)
+WALK_FEATURES = ('has_classes', 'has_class_refs', 'has_asserts', 'has_input')
 
-        i += 1
 
-    return blocks
+def analyze_ast(code: str) -> dict:
+    """Parse code once and collect every AST heuristic used by the classifier.
 
+    Returns a dict with boolean flags:
+    - has_classes: contains a class definition
+    - has_class_refs: uses class-like names (see has_class_references)
+    - has_asserts: contains 'assert' statements
+    - has_input: calls input() or something.input()
+    - only_definitions: see has_only_definitions
+    - inert_definitions: only_definitions, and defining everything cannot run
+      any user code or print (see _definitions_are_inert)
 
-def contains_class_definitions(code: str) -> bool:
-    """Check if code contains class definitions."""
+    All flags are False if the code does not parse.
+    """
     try:
         tree = ast.parse(code)
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                return True
-        return False
     except SyntaxError:
-        return False
+        return dict.fromkeys((*WALK_FEATURES, 'only_definitions', 'inert_definitions'), False)
 
+    features = _scan_tree(tree, WALK_FEATURES)
+    features['only_definitions'] = _only_definitions(tree)
+    features['inert_definitions'] = features['only_definitions'] and _definitions_are_inert(tree)
+    return features
 
-def has_asserts_or_tests(code: str) -> bool:
-    """Detect presence of asserts or simple test indicators in code.
 
-    Currently checks for Python 'assert' statements in the AST.
-    """
-    try:
-        tree = ast.parse(code)
-    except SyntaxError:
-        return False
+def _scan_tree(tree: ast.AST, wanted: Tuple[str, ...]) -> dict:
+    """Walk tree setting the WALK_FEATURES flags, stopping once all wanted flags are set."""
+    features = dict.fromkeys(WALK_FEATURES, False)
 
     for node in ast.walk(tree):
-        if isinstance(node, ast.Assert):
-            return True
-    return False
+        if isinstance(node, ast.ClassDef):
+            features['has_classes'] = True
+        elif isinstance(node, ast.Assert):
+            features['has_asserts'] = True
+        elif isinstance(node, ast.Call):
+            func = node.func
+            if isinstance(func, ast.Name):
+                # input(...)
+                if func.id == 'input':
+                    features['has_input'] = True
+                # ClassName(...)
+                if _is_pascal_case(func.id):
+                    features['has_class_refs'] = True
+                # isinstance(x, ClassName)
+                elif func.id == 'isinstance' and len(node.args) >= 2:
+                    second = node.args[1]
+                    if isinstance(second, ast.Name) and _is_pascal_case(second.id):
+                        features['has_class_refs'] = True
+            elif isinstance(func, ast.Attribute):
+                # builtins.input(...)
+                if func.attr == 'input':
+                    features['has_input'] = True
+                # module.ClassName(...)
+                if _is_pascal_case(func.attr):
+                    features['has_class_refs'] = True
+            else:
+                continue
+        else:
+            continue
+        # ast.walk is lazy, so stopping here skips the rest of the tree
+        if all(features[name] for name in wanted):
+            break
 
+    return features
 
-def contains_input_call(code: str) -> bool:
-    """Check if code contains input() calls that would block execution."""
+
+def _code_has(code: str, feature: str) -> bool:
+    """Check a single WALK_FEATURES flag, stopping at the first match."""
     try:
         tree = ast.parse(code)
     except SyntaxError:
         return False
+    return _scan_tree(tree, (feature,))[feature]
 
-    for node in ast.walk(tree):
-        if isinstance(node, ast.Call):
-            # Check for direct input() call
-            if isinstance(node.func, ast.Name) and node.func.id == 'input':
-                return True
-            # Check for builtins.input() call
-            if isinstance(node.func, ast.Attribute) and node.func.attr == 'input':
-                return True
-    return False
+
+def _is_pascal_case(name: str) -> bool:
+    return bool(name) and name[0].isupper()
+
+
+def contains_class_definitions(code: str) -> bool:
+    """Check if code contains class definitions."""
+    return _code_has(code, 'has_classes')
+
+
+def has_asserts_or_tests(code: str) -> bool:
+    """Detect presence of asserts or simple test indicators in code.
+
+    Currently checks for Python 'assert' statements in the AST.
+    """
+    return _code_has(code, 'has_asserts')
+
+
+def contains_input_call(code: str) -> bool:
+    """Check if code contains input() calls that would block execution."""
+    return _code_has(code, 'has_input')
 
 
 def has_class_references(code: str) -> bool:
@@ -112,30 +181,7 @@ def has_class_references(code: str) -> bool:
     - Call to an Attribute whose attr is PascalCase (e.g., module.ClassName(...))
     - isinstance(x, ClassName)
     """
-    try:
-        tree = ast.parse(code)
-    except SyntaxError:
-        return False
-
-    def is_pascal_case(name: str) -> bool:
-        return bool(name) and name[0].isupper()
-
-    for node in ast.walk(tree):
-        if isinstance(node, ast.Call):
-            # ClassName(...)
-            if isinstance(node.func, ast.Name) and is_pascal_case(node.func.id):
-                return True
-            # module.ClassName(...)
-            if isinstance(node.func, ast.Attribute) and is_pascal_case(node.func.attr):
-                return True
-            # isinstance(x, ClassName)
-            if isinstance(node.func, ast.Name) and node.func.id == 'isinstance':
-                if len(node.args) >= 2:
-                    second = node.args[1]
-                    if isinstance(second, ast.Name) and is_pascal_case(second.id):
-                        return True
-        # Could extend to type annotations, etc., but keep minimal
-    return False
+    return _code_has(code, 'has_class_refs')
 
 
 def has_only_definitions(code: str) -> bool:
@@ -153,21 +199,31 @@ def has_only_definitions(code: str) -> bool:
         tree = ast.parse(code)
     except SyntaxError:
         return False
-    
+    return _only_definitions(tree)
+
+
+# Statement types checked by exact type (parsed AST nodes are never subclasses)
+_DEFINITION_TYPES = frozenset({ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef})
+_IMPORT_TYPES = frozenset({ast.Import, ast.ImportFrom})
+
+
+def _only_definitions(tree: ast.Module) -> bool:
+    """has_only_definitions for an already-parsed module."""
     has_definitions = False
     
     for node in tree.body:
+        node_type = type(node)
         # Check if we have any function or class definitions
-        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        if node_type in _DEFINITION_TYPES:
             has_definitions = True
         # These are allowed at module level for definition-only code
-        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+        elif node_type in _IMPORT_TYPES:
             continue
         # Docstrings are allowed
-        elif isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant) and isinstance(node.value.value, str):
+        elif _is_docstring(node):
             continue
         # Check for if __name__ == "__main__": blocks - these indicate executable code
-        elif isinstance(node, ast.If):
+        elif node_type is ast.If:
             # Check if this is an if __name__ == "__main__" pattern
             if _is_main_guard(node):
                 # This is a main guard - code is meant to be executed
@@ -178,6 +234,65 @@ def has_only_definitions(code: str) -> bool:
     
     return has_definitions
 
+# Expressions containing these nodes may run arbitrary or unbounded work
+_NON_INERT_EXPR_NODES = (ast.Call, ast.BinOp, ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+# Dunder methods Python calls implicitly while building a class
+_CLASS_CREATION_HOOKS = frozenset({'__init_subclass__', '__class_getitem__', '__set_name__'})
+
+
+def _definitions_are_inert(tree: ast.Module) -> bool:
+    """Check that executing a definition-only module cannot print, assert or hang.
+
+    Only imports, docstrings, plain function definitions and plain class
+    definitions are accepted: no decorators, no metaclass or class keywords,
+    no calls in defaults, annotations or class attributes, and no class
+    creation hooks. Anything else is left for actual execution to decide.
+    """
+    for node in tree.body:
+        if type(node) in _IMPORT_TYPES or _is_docstring(node):
+            continue
+        if not _definition_is_inert(node):
+            return False
+    return True
+
+
+def _definition_is_inert(node: ast.stmt) -> bool:
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        if node.decorator_list or node.name in _CLASS_CREATION_HOOKS:
+            return False
+        args = node.args
+        evaluated = [*args.defaults, *(d for d in args.kw_defaults if d is not None), node.returns]
+        evaluated.extend(a.annotation for a in (*args.posonlyargs, *args.args, *args.kwonlyargs))
+        evaluated.extend(a.annotation for a in (args.vararg, args.kwarg) if a is not None)
+        return all(_expr_is_inert(expr) for expr in evaluated)
+    if isinstance(node, ast.ClassDef):
+        if node.decorator_list or node.keywords:
+            return False
+        if not all(_expr_is_inert(base) for base in node.bases):
+            return False
+        for stmt in node.body:
+            if isinstance(stmt, ast.Pass) or _is_docstring(stmt):
+                continue
+            if isinstance(stmt, ast.Assign):
+                if not all(isinstance(t, ast.Name) for t in stmt.targets) or not _expr_is_inert(stmt.value):
+                    return False
+            elif isinstance(stmt, ast.AnnAssign):
+                if not (_expr_is_inert(stmt.annotation) and _expr_is_inert(stmt.value)):
+                    return False
+            elif not _definition_is_inert(stmt):
+                return False
+        return True
+    return False
+
+
+def _expr_is_inert(node: Optional[ast.expr]) -> bool:
+    return node is None or not any(isinstance(n, _NON_INERT_EXPR_NODES) for n in ast.walk(node))
+
+
+def _is_docstring(node: ast.stmt) -> bool:
+    return type(node) is ast.Expr and type(node.value) is ast.Constant and type(node.value.value) is str
+
+
 def _is_main_guard(node: ast.If) -> bool:
     """Check if an If node is a __name__ == "__main__" guard pattern."""
     if not isinstance(node.test, ast.Compare):
@@ -201,122 +316,257 @@ def _is_main_guard(node: ast.If) -> bool:
     return False
 
 
-def _exec_worker(code: str, q: Queue) -> None:
-    """Worker process to execute code in isolation and return results via queue."""
+def _make_safe_builtins() -> dict:
+    """Build the restricted builtins that code blocks are executed with."""
+    # Import builtins to get __build_class__
+    import builtins
+    
+    # Create a restricted globals dict with essential builtins
+    safe_builtins = {
+        'print': print,
+        'input': (lambda prompt="": ""),  # don't block on input
+        'len': len,
+        'range': range,
+        'int': int,
+        'str': str,
+        'list': list,
+        'dict': dict,
+        'set': set,
+        'tuple': tuple,
+        'bool': bool,
+        'float': float,
+        'type': type,
+        'super': super,  # Required for inheritance
+        'isinstance': isinstance,
+        'enumerate': enumerate,
+        'zip': zip,
+        'sum': sum,
+        'max': max,
+        'min': min,
+        'abs': abs,
+        'round': round,
+        'sorted': sorted,
+        'any': any,
+        'all': all,
+        'property': property,  # For property decorators
+        'staticmethod': staticmethod,  # For static methods
+        'classmethod': classmethod,  # For class methods
+        'ValueError': ValueError,  # Common exceptions
+        'TypeError': TypeError,
+        'KeyError': KeyError,
+        'IndexError': IndexError,
+        'AttributeError': AttributeError,
+        'ZeroDivisionError': ZeroDivisionError,
+        'FileNotFoundError': FileNotFoundError,
+        'Exception': Exception,
+        # Critical for class creation
+        '__build_class__': builtins.__build_class__,
+        '__name__': '__main__',
+    }
+    return safe_builtins
+
+
+# Extra time the parent allows past a block's timeout before killing the worker,
+# for blocks that swallow the in-worker alarm or block it in C code
+KILL_GRACE_SEC = 1.0
+
+
+class _ExecTimeout(BaseException):
+    """Raised by SIGALRM inside the worker (BaseException so `except Exception` can't catch it)."""
+
+
+def _raise_exec_timeout(signum, frame):
+    raise _ExecTimeout
+
+
+class _OutputFlag(io.TextIOBase):
+    """Stand-in for stdout that only records whether anything visible was printed."""
+
+    def __init__(self):
+        self.had_output = False
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, s: str) -> int:
+        if not self.had_output and s.strip():
+            self.had_output = True
+        return len(s)
+
+
+def _run_code(code: str, safe_builtins: dict, timeout_sec: float) -> dict:
+    """Execute one code block and describe the outcome as a small dict."""
+    # Where available, interrupt runaway blocks inside the worker so it can be
+    # reused; the parent still kills it if the alarm doesn't stop the block
+    use_alarm = hasattr(signal, 'setitimer')
     try:
-        # Import builtins to get __build_class__
-        import builtins
-        
-        # Create a restricted globals dict with essential builtins
-        safe_builtins = {
-            'print': print,
-            'input': (lambda prompt="": ""),  # don't block on input
-            'len': len,
-            'range': range,
-            'int': int,
-            'str': str,
-            'list': list,
-            'dict': dict,
-            'set': set,
-            'tuple': tuple,
-            'bool': bool,
-            'float': float,
-            'type': type,
-            'super': super,  # Required for inheritance
-            'isinstance': isinstance,
-            'enumerate': enumerate,
-            'zip': zip,
-            'sum': sum,
-            'max': max,
-            'min': min,
-            'abs': abs,
-            'round': round,
-            'sorted': sorted,
-            'any': any,
-            'all': all,
-            'property': property,  # For property decorators
-            'staticmethod': staticmethod,  # For static methods
-            'classmethod': classmethod,  # For class methods
-            'ValueError': ValueError,  # Common exceptions
-            'TypeError': TypeError,
-            'KeyError': KeyError,
-            'IndexError': IndexError,
-            'AttributeError': AttributeError,
-            'ZeroDivisionError': ZeroDivisionError,
-            'FileNotFoundError': FileNotFoundError,
-            'Exception': Exception,
-            # Critical for class creation
-            '__build_class__': builtins.__build_class__,
-            '__name__': '__main__',
-        }
-        
-        safe_globals = {'__builtins__': safe_builtins}
-        buf = io.StringIO()
-        with redirect_stdout(buf):
-            exec(code, safe_globals)
-        q.put({"ok": True, "stdout": buf.getvalue()})
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, timeout_sec)
+        try:
+            # Each block gets fresh globals (and its own copy of the builtins)
+            safe_globals = {'__builtins__': dict(safe_builtins)}
+            sink = _OutputFlag()
+            with redirect_stdout(sink):
+                exec(code, safe_globals)
+        finally:
+            if use_alarm:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        return {"ok": True, "had_output": sink.had_output}
+    except _ExecTimeout:
+        return {"ok": False, "timed_out": True}
     except Exception as e:
-        q.put({"ok": False, "err_type": e.__class__.__name__, "err_msg": str(e)})
+        return {"ok": False, "err_type": e.__class__.__name__, "err_msg": str(e)}
+
+
+def _exec_worker(conn: Connection) -> None:
+    """Worker process loop: execute each code block received on conn and send back the result."""
+    safe_builtins = _make_safe_builtins()
+    if hasattr(signal, 'setitimer'):
+        signal.signal(signal.SIGALRM, _raise_exec_timeout)
+    while True:
+        try:
+            code, timeout_sec = conn.recv()
+        except EOFError:
+            # The parent has gone away
+            return
+        conn.send(_run_code(code, safe_builtins, timeout_sec))
+
+
+class _ExecWorker:
+    """A long-lived worker process, so blocks don't each pay for a new process."""
+
+    def __init__(self):
+        self.conn, child_conn = Pipe()
+        self.process = Process(target=_exec_worker, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def run(self, code: str, timeout_sec: float) -> Optional[dict]:
+        """Run code in the worker; None means it hung or the worker died."""
+        self.conn.send((code, timeout_sec))
+        # Wakes on a result, on the worker exiting, or at the deadline
+        ready = wait([self.conn, self.process.sentinel], timeout_sec + KILL_GRACE_SEC)
+        if self.conn in ready:
+            try:
+                return self.conn.recv()
+            except EOFError:
+                pass
+        if ready:
+            # The worker died; reap it so the caller doesn't mistake this for a hang
+            self.process.join(KILL_GRACE_SEC)
+        return None
+
+    def stop(self) -> None:
+        self.process.terminate()
+        self.process.join()
+        self.conn.close()
 
 
-def can_execute_code(code: str, timeout_sec: float = 10.0) -> Tuple[bool, str, Optional[str], bool, str]:
+_worker: Optional[_ExecWorker] = None
+
+# (success, had_output, error_type, timed_out, error_message)
+ExecResult = Tuple[bool, bool, Optional[str], bool, str]
+
+# Returned when the worker dies without reporting a result
+NO_RESULT: ExecResult = (False, False, "ExecutionError", False, "No result from execution")
+
+# can_execute_code results by _exec_cache_key, and the ones added since the
+# last _take_new_exec_results call (so main can persist them between runs)
+_exec_cache: dict[str, ExecResult] = {}
+_new_exec_results: dict[str, ExecResult] = {}
+
+
+def _exec_cache_key(code: str, timeout_sec: float) -> str:
+    return f"{timeout_sec}:{hashlib.blake2b(code.encode('utf-8'), digest_size=16).hexdigest()}"
+
+
+def _seed_exec_cache(results: dict[str, ExecResult]) -> None:
+    """Pool initializer: start from the results saved by the previous run."""
+    _exec_cache.update(results)
+
+
+def _take_new_exec_results() -> dict[str, ExecResult]:
+    new_results = dict(_new_exec_results)
+    _new_exec_results.clear()
+    return new_results
+
+
+def can_execute_code(code: str, timeout_sec: float = 10.0) -> ExecResult:
     """
     Test if code can be executed without errors, with timeout.
-    Returns (success, captured_stdout, error_type, timed_out, error_message).
+    Returns (success, had_output, error_type, timed_out, error_message), where
+    had_output is whether the code printed anything other than whitespace.
+
+    Results are cached by a hash of the code, so identical snippets only run once.
+    Timeouts and worker deaths may be down to load rather than the code, so
+    they are not cached and the block runs again next time.
     """
+    key = _exec_cache_key(code, timeout_sec)
+    result = _exec_cache.get(key)
+    if result is None:
+        result = _execute_code(code, timeout_sec)
+        if not result[3] and result != NO_RESULT:
+            _exec_cache[key] = _new_exec_results[key] = result
+    return result
+
+
+def _execute_code(code: str, timeout_sec: float) -> ExecResult:
+    """can_execute_code without the cache."""
+    global _worker
+
     # First try to compile quickly to catch syntax errors fast
     try:
         compile(code, '<string>', 'exec')
     except Exception as e:
-        return False, "", e.__class__.__name__, False, str(e)
+        return False, False, e.__class__.__name__, False, str(e)
 
-    q: Queue = Queue()
-    p = Process(target=_exec_worker, args=(code, q))
-    p.start()
-    p.join(timeout_sec)
+    if _worker is None:
+        _worker = _ExecWorker()
+    result = _worker.run(code, timeout_sec)
 
-    if p.is_alive():
-        p.terminate()
-        p.join()
-        return False, "", "TimeoutError", True, "Execution timeout"
-
-    # Process finished; fetch result from queue
-    try:
-        result = q.get_nowait()
-    except Exception:
+    if result is None:
+        # The worker is stuck or gone; replace it for the next block
+        timed_out = _worker.process.is_alive()
+        _worker.stop()
+        _worker = None
+        if timed_out:
+            return False, False, "TimeoutError", True, "Execution timeout"
         # No result; treat as failure
-        return False, "", "ExecutionError", False, "No result from execution"
+        return NO_RESULT
 
     if result.get("ok"):
-        return True, result.get("stdout", ""), None, False, ""
+        return True, result.get("had_output", False), None, False, ""
+    elif result.get("timed_out"):
+        return False, False, "TimeoutError", True, "Execution timeout"
     else:
-        return False, "", result.get("err_type", "ExecutionError"), False, result.get("err_msg", "")
+        return False, False, result.get("err_type", "ExecutionError"), False, result.get("err_msg", "")
 
 
-def update_code_block(content: str, start_line: int, end_line: int, new_fence: str) -> str:
-    """Update a code block's fence type."""
-    lines = content.split('\n')
-
+def update_code_block(lines: List[str], start_line: int, new_fence: str) -> None:
+    """Update a code block's fence type in place."""
     # Update opening fence
     lines[start_line] = f'```{new_fence}'
 
-    return '\n'.join(lines)
-
 
-def process_file(file_path: Path, timeouts_accumulator: list[tuple[Path, int]] | None = None) -> int:
-    """Process a single markdown file. Returns number of changes made.
+def process_file(file_path: Path, timeouts_accumulator: list[tuple[Path, int]] | None = None,
+                 content: str | None = None) -> int | None:
+    """Process a single markdown file. Returns number of changes made, or None
+    if the file could not be read or written back.
 
     Any blocks that exceed timeout are appended to timeouts_accumulator as (file_path, start_line).
+    content may be passed when the file has already been read; otherwise it is read here.
     """
     print(f"Processing {file_path}")
 
-    try:
-        content = file_path.read_text(encoding='utf-8')
-    except Exception as e:
-        print(f"  Error reading file: {e}")
-        return 0
+    if content is None:
+        try:
+            content = file_path.read_text(encoding='utf-8')
+        except Exception as e:
+            print(f"  Error reading file: {e}")
+            return None
 
     code_blocks = find_python_code_blocks(content)
+    lines = content.split('\n')
     if not code_blocks:
         print("  No Python code blocks found")
         return 0
@@ -324,20 +574,31 @@ def process_file(file_path: Path, timeouts_accumulator: list[tuple[Path, int]] |
     print(f"  Found {len(code_blocks)} Python code blocks")
 
     changes_made = 0
-    updated_content = content
 
     for start_line, end_line, code, current_fence in code_blocks:
         # Skip empty code blocks
         if not code.strip():
             continue
 
-        # Heuristics
-        has_classes = contains_class_definitions(code)
-        has_class_refs = has_class_references(code)
-        has_asserts = has_asserts_or_tests(code)
-        only_definitions = has_only_definitions(code)
+        # Heuristics (one parse and one tree walk per block)
+        features = analyze_ast(code)
+        has_classes = features['has_classes']
+        has_class_refs = features['has_class_refs']
+        has_asserts = features['has_asserts']
+        only_definitions = features['only_definitions']
+
+        # Definitions that cannot print or assert anything would be templated
+        # whatever execution reports, so don't run them
+        if features['inert_definitions'] and not has_asserts:
+            new_fence = "python-template"
+            print(f"  Line {start_line+1}: ✎ Only contains function/class definitions → python-template")
+            if new_fence != current_fence:
+                update_code_block(lines, start_line, new_fence)
+                changes_made += 1
+            continue
+
         # Actual execution check
-        exec_ok, stdout_text, err_type, timed_out, err_msg = can_execute_code(code, timeout_sec=2.0)
+        exec_ok, had_output, err_type, timed_out, err_msg = can_execute_code(code, timeout_sec=2.0)
 
         if timed_out:
             # Skip modification and record timeout
@@ -350,8 +611,8 @@ def process_file(file_path: Path, timeouts_accumulator: list[tuple[Path, int]] |
 
         # Classification rules (strict order):
         # 1) Exec if code runs AND (produces output OR contains asserts)
-        if exec_ok and (stdout_text.strip() or has_asserts):
-            out_note = " with output" if stdout_text.strip() else " with asserts"
+        if exec_ok and (had_output or has_asserts):
+            out_note = " with output" if had_output else " with asserts"
             print(f"  Line {start_line+1}: ✓ Executed successfully{out_note} → python-exec")
             new_fence = "python-exec"
         # 2) Template if only contains definitions without external execution
@@ -372,20 +633,80 @@ def process_file(file_path: Path, timeouts_accumulator: list[tuple[Path, int]] |
             new_fence = "python"
 
         if new_fence != current_fence:
-            updated_content = update_code_block(updated_content, start_line, end_line, new_fence)
+            update_code_block(lines, start_line, new_fence)
             changes_made += 1
 
     if changes_made > 0:
         try:
-            file_path.write_text(updated_content, encoding='utf-8')
+            file_path.write_text('\n'.join(lines), encoding='utf-8')
             print(f"  ✅ Made {changes_made} changes")
         except Exception as e:
             print(f"  ❌ Error writing file: {e}")
-            return 0
+            return None
 
     return changes_made
 
 
+def find_index_files(docs_dir: Path) -> List[Path]:
+    """Find every index.md under docs_dir."""
+    return [path for path in iter_markdown_files(docs_dir) if path.name == 'index.md']
+
+
+def _read_prefetched(file_path: Path) -> str | None:
+    """Read a file ahead of processing; None lets process_file retry and report the error."""
+    try:
+        return file_path.read_text(encoding='utf-8')
+    except Exception:
+        return None
+
+
+def _file_signature(file_path: Path) -> list[int] | None:
+    """(mtime_ns, size) of a file, as stored in the run cache; None if it can't be read."""
+    try:
+        st = file_path.stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _load_run_cache(cache_path: Path, script_digest: str) -> tuple[dict[str, list[int]], dict[str, tuple]]:
+    """Load what the last run of this script version saved.
+
+    Returns (file signatures of files it left unchanged, can_execute_code results).
+    The cache is discarded when the script itself has changed, as its rules may have too.
+    """
+    try:
+        data = json.loads(cache_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}, {}
+    if not isinstance(data, dict) or data.get("script") != script_digest:
+        return {}, {}
+    exec_results = {key: tuple(result) for key, result in data.get("exec_results", {}).items()}
+    return data.get("files", {}), exec_results
+
+
+def _save_run_cache(cache_path: Path, script_digest: str, files: dict[str, list[int]],
+                    exec_results: dict[str, tuple]) -> None:
+    data = {"script": script_digest, "files": files, "exec_results": exec_results}
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps(data), encoding='utf-8')
+    except OSError as e:
+        print(f"  Warning: could not write run cache {cache_path}: {e}")
+
+
+def _process_file_buffered(file_path: Path, content: str | None) -> tuple[str, int | None, list[tuple[Path, int]], dict]:
+    """Run process_file with its output captured, for use in a worker process.
+
+    Returns (printed_output, changes_made, timed_out_blocks, new_exec_results).
+    """
+    timeouts: list[tuple[Path, int]] = []
+    buf = io.StringIO()
+    with redirect_stdout(buf):
+        changes = process_file(file_path, timeouts_accumulator=timeouts, content=content)
+    return buf.getvalue(), changes, timeouts, _take_new_exec_results()
+
+
 def main():
     """Main entry point."""
     # Find script directory and go up to repo root
@@ -398,7 +719,7 @@ def main():
         sys.exit(1)
 
     # Find all index.md files in docs/
-    index_files = list(docs_dir.rglob("index.md"))
+    index_files = find_index_files(docs_dir)
 
     if not index_files:
         print("No index.md files found in docs/")
@@ -410,10 +731,47 @@ def main():
     total_changes = 0
     timed_out_blocks: list[tuple[Path, int]] = []
 
-    for file_path in sorted(index_files):
-        changes = process_file(file_path, timeouts_accumulator=timed_out_blocks)
-        total_changes += changes
-        print()
+    # Files whose mtime and size match the last run's result are skipped, and
+    # blocks the last run already executed reuse its results
+    cache_path = repo_root / RUN_CACHE_PATH
+    script_digest = hashlib.sha1(Path(__file__).read_bytes()).hexdigest()
+    run_cache, exec_results = _load_run_cache(cache_path, script_digest)
+    sorted_files = sorted(index_files)
+    cache_keys = [file_path.relative_to(repo_root).as_posix() for file_path in sorted_files]
+    unchanged = [
+        key in run_cache and run_cache[key] == _file_signature(file_path)
+        for file_path, key in zip(sorted_files, cache_keys)
+    ]
+    new_cache = {key: run_cache[key] for key, skip in zip(cache_keys, unchanged) if skip}
+
+    # Files are independent, so process them in parallel; each pool process
+    # keeps its own execution worker. Output is replayed in sorted order.
+    # Reads are prefetched on threads so they overlap with code execution.
+    with (ThreadPoolExecutor(max_workers=8) as readers,
+          ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_seed_exec_cache, initargs=(exec_results,)) as pool):
+        reads = [None if skip else readers.submit(_read_prefetched, file_path)
+                 for file_path, skip in zip(sorted_files, unchanged)]
+        futures = [None if read is None else pool.submit(_process_file_buffered, file_path, read.result())
+                   for file_path, read in zip(sorted_files, reads)]
+        for file_path, key, future in zip(sorted_files, cache_keys, futures):
+            if future is None:
+                print(f"Processing {file_path}")
+                print("  Unchanged since last run, skipping")
+                print()
+                continue
+            output, changes, timeouts, new_exec_results = future.result()
+            exec_results.update(new_exec_results)
+            sys.stdout.write(output)
+            total_changes += changes or 0
+            timed_out_blocks.extend(timeouts)
+            # Files that failed to read or write, and timed-out blocks, should be
+            # processed again next time
+            signature = _file_signature(file_path)
+            if changes is not None and not timeouts and signature is not None:
+                new_cache[key] = signature
+            print()
+
+    _save_run_cache(cache_path, script_digest, new_cache, exec_results)
 
     print(f"🎉 Processing complete! Total changes made: {total_changes}")
 
@@ -422,7 +780,7 @@ def main():
         print("  - ```python-exec: Code runs AND (produces output OR contains asserts)")
         print("  - ```python-template: Only contains function/class definitions OR (fails AND has class definitions/references AND not due to missing library)")
         print("  - ```python: Unchanged (all other cases)")
-        print("\n  Note: All Python blocks (including previously tagged) were re-evaluated.")
+        print("\n  Note: All Python blocks (including previously tagged) in changed files were re-evaluated.")
 
     if timed_out_blocks:
         print("\n⏱ Timed out blocks (execution took >2 seconds):")
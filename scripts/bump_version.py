@@ -8,11 +8,15 @@ import re
 import sys
 from pathlib import Path
 
+# The project's `version = "..."` line (group 1 is the version string)
+VERSION_RE = re.compile(r'^version\s*=\s*["\']([^"\']+)["\']', re.MULTILINE)
+SEMVER_RE = re.compile(r'^(\d+)\.(\d+)\.(\d+)$')
+
 
 def read_version(pyproject_path: Path) -> str:
     """Read current version from pyproject.toml"""
     content = pyproject_path.read_text(encoding='utf-8')
-    match = re.search(r'^version\s*=\s*["\']([^"\']+)["\']', content, re.MULTILINE)
+    match = VERSION_RE.search(content)
     if not match:
         raise ValueError("Could not find version in pyproject.toml")
     return match.group(1)
@@ -20,7 +24,7 @@ def read_version(pyproject_path: Path) -> str:
 
 def parse_version(version: str) -> tuple[int, int, int]:
     """Parse version string into (major, minor, patch) tuple"""
-    match = re.match(r'^(\d+)\.(\d+)\.(\d+)$', version)
+    match = SEMVER_RE.match(version)
     if not match:
         raise ValueError(f"Invalid version format: {version}")
     major, minor, patch = map(int, match.groups())
@@ -63,13 +67,7 @@ def bump_version(version: str, bump_type: str = 'patch') -> str:
 def write_version(pyproject_path: Path, new_version: str) -> None:
     """Write new version to pyproject.toml"""
     content = pyproject_path.read_text(encoding='utf-8')
-    new_content = re.sub(
-        r'^version\s*=\s*["\'][^"\']+["\']',
-        f'version = "{new_version}"',
-        content,
-        count=1,
-        flags=re.MULTILINE
-    )
+    new_content = VERSION_RE.sub(lambda _: f'version = "{new_version}"', content, count=1)
     pyproject_path.write_text(new_content, encoding='utf-8')
 
 
@@ -6,20 +6,16 @@ This script finds and debugs all Kroki diagrams in the MkDocs textbook.
 It identifies syntax errors, validates diagram types, and suggests fixes.
 """
 
+import base64
 import os
 import re
 import sys
 import json
+import zlib
 import requests
-from pathlib import Path
-from typing import List, Dict, Tuple, Optional
-import argparse
-
-import os
-import re
-import sys
-import json
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List, Dict, Tuple, Optional
 import argparse
@@ -31,36 +27,105 @@ KROKI_TYPES = {
     'excalidraw', 'nomnoml', 'svgbob', 'vega', 'vegalite', 'wavedrom'
 }
 
+# Lines starting with these end a mermaid diagram that has markdown mixed in,
+# unless they open another mermaid fence
+MARKDOWN_STOP_PREFIXES = ('```', '///', '===', '#')
+MERMAID_FENCE_PREFIXES = ('```mermaid', '```kroki-mermaid')
+
+# First-line keywords of the Mermaid diagram types the validator accepts
+MERMAID_VALID_STARTS = ('graph', 'flowchart', 'sequenceDiagram', 'classDiagram',
+                        'stateDiagram', 'erDiagram', 'journey', 'gantt', 'pie')
+# Mermaid first lines _suggest_fix treats as already declaring a type
+MERMAID_FIXABLE_STARTS = ('graph', 'flowchart', 'sequenceDiagram', 'classDiagram')
+# Lines where the real diagram starts after a stray nested fence
+DIAGRAM_BODY_STARTS = ('@start', 'flowchart', 'graph', 'sequenceDiagram')
+
+# Character escapes applied to suggested fixes, one str.translate pass each
+PLANTUML_ESCAPES = str.maketrans({
+    '→': '\\u2192',  # Right arrow
+    '←': '\\u2190',  # Left arrow
+    '↑': '\\u2191',  # Up arrow
+    '↓': '\\u2193',  # Down arrow
+    '≥': '\\u2265',  # Greater than or equal
+    '≤': '\\u2264',  # Less than or equal
+    '≠': '\\u2260',  # Not equal
+})
+MERMAID_ESCAPES = str.maketrans({
+    '≥': '>=',  # Use standard comparison
+    '≤': '<=',  # Use standard comparison
+    '\u2018': "'",  # Replace smart quotes
+    '\u2019': "'",
+    '\u201c': '"',
+    '\u201d': '"',
+})
+
+# Diagrams validated (and Kroki connections kept open) at once
+VALIDATION_WORKERS = 16
+
+# Fenced diagram blocks: ```kroki-<type> or ```<type> (for supported types)
+KROKI_BLOCK_RE = re.compile(r'```(?:kroki-)?(\w+)\s*\n(.*?)\n```', re.DOTALL)
+# Plain ```plantuml / ```mermaid fences (but not if already kroki-)
+PLANTUML_FENCE_RE = re.compile(r'```plantuml\b(?!\w)')
+MERMAID_FENCE_RE = re.compile(r'```mermaid\b(?!\w)')
+
+@dataclass(slots=True)
 class KrokiDiagram:
-    def __init__(self, file_path: str, diagram_type: str, content: str, 
-                 start_line: int, end_line: int):
-        self.file_path = file_path
-        self.diagram_type = diagram_type
-        self.content = content
-        self.start_line = start_line
-        self.end_line = end_line
-        self.issues = []
+    file_path: str
+    diagram_type: str
+    content: str
+    start_line: int
+    end_line: int
+    issues: List[str] = field(default_factory=list)
+    # Character span of the whole fenced block in the file when it was scanned
+    start_offset: int = -1
+    end_offset: int = -1
 
 class KrokiDebugger:
+    # Diagram type -> name of the method that checks its syntax
+    _SYNTAX_VALIDATORS = {
+        'plantuml': '_validate_plantuml',
+        'mermaid': '_validate_mermaid',
+        'blockdiag': '_validate_blockdiag',
+    }
+
     def __init__(self, docs_dir: str = "docs", kroki_url: str = "http://localhost:8000"):
         self.docs_dir = Path(docs_dir)
         self.kroki_url = kroki_url
         self.diagrams = []
         self.issues_found = 0
         self.fixes_applied = 0
+        # Result of the Kroki health probe, made at most once per run
+        self._kroki_available: Optional[bool] = None
+        # One keep-alive connection pool for every request to Kroki
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=VALIDATION_WORKERS)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
 
     def find_all_diagrams(self) -> List[KrokiDiagram]:
         """Find all Kroki diagrams in markdown files."""
         print("🔍 Scanning for Kroki diagrams...")
         
-        for md_file in self.docs_dir.rglob("*.md"):
-            self._scan_file(md_file)
+        # Files are independent, so read and scan them on a thread pool;
+        # results and messages are still taken in file order
+        md_files = list(self.docs_dir.rglob("*.md"))
+        with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as pool:
+            for diagrams, messages in pool.map(self._scan_file, md_files):
+                for message in messages:
+                    print(message)
+                self.diagrams.extend(diagrams)
         
         print(f"Found {len(self.diagrams)} Kroki diagrams in {len(set(d.file_path for d in self.diagrams))} files")
         return self.diagrams
 
-    def _scan_file(self, file_path: Path):
-        """Scan a single markdown file for Kroki diagrams."""
+    def _scan_file(self, file_path: Path) -> Tuple[List[KrokiDiagram], List[str]]:
+        """Scan a single markdown file for Kroki diagrams.
+
+        Returns (diagrams, messages); the caller prints the messages so that
+        files scanned in parallel still report in order.
+        """
+        diagrams = []
+        messages = []
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
@@ -73,12 +138,14 @@ class KrokiDebugger:
             if content != original_content:
                 with open(file_path, 'w', encoding='utf-8') as f:
                     f.write(content)
-                print(f"✅ Converted diagram formats in {file_path.name}")
+                messages.append(f"✅ Converted diagram formats in {file_path.name}")
             
-            # Pattern to match kroki code blocks: ```kroki-<type> or ```<type> (for supported types)
-            pattern = r'```(?:kroki-)?(\w+)\s*\n(.*?)\n```'
+            # Line numbers are counted on from the previous diagram, not from
+            # the top of the file for each one
+            line_no = 1
+            counted_to = 0
             
-            for match in re.finditer(pattern, content, re.DOTALL):
+            for match in KROKI_BLOCK_RE.finditer(content):
                 diagram_type = match.group(1).lower()
                 diagram_content = match.group(2)
                 
@@ -86,7 +153,9 @@ class KrokiDebugger:
                 if diagram_type in KROKI_TYPES:
                     # Calculate line numbers
                     start_pos = match.start()
-                    start_line = content[:start_pos].count('\n') + 1
+                    line_no += content.count('\n', counted_to, start_pos)
+                    counted_to = start_pos
+                    start_line = line_no
                     end_line = start_line + diagram_content.count('\n') + 2  # +2 for ``` lines
                     
                     diagram = KrokiDiagram(
@@ -94,20 +163,30 @@ class KrokiDebugger:
                         diagram_type=diagram_type,
                         content=diagram_content,
                         start_line=start_line,
-                        end_line=end_line
+                        end_line=end_line,
+                        start_offset=start_pos,
+                        end_offset=match.end()
                     )
-                    self.diagrams.append(diagram)
+                    diagrams.append(diagram)
                     
         except Exception as e:
-            print(f"❌ Error scanning {file_path}: {e}")
+            messages.append(f"❌ Error scanning {file_path}: {e}")
+        
+        return diagrams, messages
     
     def _convert_to_kroki_format(self, content: str) -> str:
         """Convert plain ```plantuml and ```mermaid to kroki- format."""
+        # Most files have neither fence: a substring check skips the
+        # substitution and returns the same object, so the caller's
+        # comparison with the original is immediate
+        
         # Convert ```plantuml to ```kroki-plantuml (but not if already kroki-)
-        content = re.sub(r'```plantuml\b(?!\w)', '```kroki-plantuml', content)
+        if '```plantuml' in content:
+            content = PLANTUML_FENCE_RE.sub('```kroki-plantuml', content)
         
         # Convert ```mermaid to ```kroki-mermaid (but not if already kroki-)
-        content = re.sub(r'```mermaid\b(?!\w)', '```kroki-mermaid', content)
+        if '```mermaid' in content:
+            content = MERMAID_FENCE_RE.sub('```kroki-mermaid', content)
         
         return content
 
@@ -116,11 +195,18 @@ class KrokiDebugger:
         print("\n🔍 Validating diagrams...")
         broken_diagrams = []
         
-        for i, diagram in enumerate(self.diagrams, 1):
-            print(f"Validating {i}/{len(self.diagrams)}: {Path(diagram.file_path).name}")
-            
-            if self._validate_diagram(diagram):
-                broken_diagrams.append(diagram)
+        # Probe Kroki up front rather than racing the first validations to it
+        self._is_kroki_available()
+        
+        # Each check only touches its own diagram, so round trips to Kroki
+        # can overlap; progress is still reported in order
+        with ThreadPoolExecutor(max_workers=VALIDATION_WORKERS) as pool:
+            results = pool.map(self._validate_diagram, self.diagrams)
+            for i, (diagram, has_issues) in enumerate(zip(self.diagrams, results), 1):
+                print(f"Validating {i}/{len(self.diagrams)}: {Path(diagram.file_path).name}")
+                
+                if has_issues:
+                    broken_diagrams.append(diagram)
         
         print(f"\n📊 Validation complete: {len(broken_diagrams)} issues found")
         return broken_diagrams
@@ -135,16 +221,15 @@ class KrokiDebugger:
             has_issues = True
         
         # Check 2: Basic syntax validation
-        if diagram.diagram_type == 'plantuml':
-            has_issues |= self._validate_plantuml(diagram)
-        elif diagram.diagram_type == 'mermaid':
-            has_issues |= self._validate_mermaid(diagram)
-        elif diagram.diagram_type == 'blockdiag':
-            has_issues |= self._validate_blockdiag(diagram)
+        validator = self._SYNTAX_VALIDATORS.get(diagram.diagram_type)
+        if validator:
+            has_issues |= getattr(self, validator)(diagram)
         
-        # Check 3: Try to render with Kroki service (if available)
-        if self._is_kroki_available():
-            has_issues |= self._validate_with_kroki(diagram)
+        # Check 3: Try to render with Kroki service (if available). Diagrams
+        # that already failed a local check are broken either way, so they
+        # don't cost a round trip
+        if not has_issues and self._is_kroki_available():
+            has_issues = self._validate_with_kroki(diagram)
         
         return has_issues
 
@@ -184,11 +269,9 @@ class KrokiDebugger:
         has_issues = False
         
         # Check for diagram type declaration
-        first_line = content.split('\n')[0].strip()
-        valid_starts = ['graph', 'flowchart', 'sequenceDiagram', 'classDiagram', 
-                       'stateDiagram', 'erDiagram', 'journey', 'gantt', 'pie']
+        first_line = content.split('\n', 1)[0].strip()
         
-        if not any(first_line.startswith(start) for start in valid_starts):
+        if not first_line.startswith(MERMAID_VALID_STARTS):
             diagram.issues.append(f"Mermaid diagram should start with a valid type. Found: {first_line}")
             has_issues = True
         
@@ -214,9 +297,6 @@ class KrokiDebugger:
     def _validate_with_kroki(self, diagram: KrokiDiagram) -> bool:
         """Validate diagram by attempting to render it with Kroki service."""
         try:
-            import base64
-            import zlib
-            
             # Encode content for Kroki
             encoded = base64.urlsafe_b64encode(
                 zlib.compress(diagram.content.encode('utf-8'))
@@ -224,7 +304,7 @@ class KrokiDebugger:
             
             # Make request to Kroki
             url = f"{self.kroki_url}/{diagram.diagram_type}/svg/{encoded}"
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
             
             if response.status_code != 200:
                 error_msg = f"Kroki rendering failed (HTTP {response.status_code})"
@@ -240,12 +320,14 @@ class KrokiDebugger:
         return False
 
     def _is_kroki_available(self) -> bool:
-        """Check if Kroki service is available."""
-        try:
-            response = requests.get(f"{self.kroki_url}/health", timeout=5)
-            return response.status_code == 200
-        except:
-            return False
+        """Check if Kroki service is available (probed once, then remembered)."""
+        if self._kroki_available is None:
+            try:
+                response = self.session.get(f"{self.kroki_url}/health", timeout=5)
+                self._kroki_available = response.status_code == 200
+            except:
+                self._kroki_available = False
+        return self._kroki_available
 
     def present_issues(self, broken_diagrams: List[KrokiDiagram], interactive: bool = True):
         """Present issues to the user and offer fixes."""
@@ -310,46 +392,30 @@ class KrokiDebugger:
 
     def _clean_mermaid_content(self, content: str) -> str:
         """Clean mermaid content that has markdown mixed in."""
-        lines = content.split('\n')
-        clean_lines = []
-        in_diagram = True
-        
+        return '\n'.join(self._iter_mermaid_lines(content.split('\n')))
+
+    @staticmethod
+    def _iter_mermaid_lines(lines: List[str]):
+        """Yield non-blank diagram lines up to the first line of markdown content."""
         for line in lines:
             stripped = line.strip()
             
             # Stop when we hit markdown content
-            if (stripped.startswith('```') and not stripped.startswith('```mermaid') and not stripped.startswith('```kroki-mermaid')) or \
-               stripped.startswith('///') or \
-               stripped.startswith('===') or \
-               stripped.startswith('#'):
-                in_diagram = False
-                break
+            if stripped.startswith(MARKDOWN_STOP_PREFIXES) and not stripped.startswith(MERMAID_FENCE_PREFIXES):
+                return
                 
-            if in_diagram and stripped:
-                clean_lines.append(line)
-        
-        return '\n'.join(clean_lines)
+            if stripped:
+                yield line
 
     def _escape_diagram_content(self, content: str, diagram_type: str) -> str:
         """Escape problematic characters in diagram content."""
         if diagram_type == 'plantuml':
             # Escape special characters that interfere with markdown
-            content = content.replace('→', '\\u2192')  # Right arrow
-            content = content.replace('←', '\\u2190')  # Left arrow
-            content = content.replace('↑', '\\u2191')  # Up arrow
-            content = content.replace('↓', '\\u2193')  # Down arrow
-            content = content.replace('≥', '\\u2265')  # Greater than or equal
-            content = content.replace('≤', '\\u2264')  # Less than or equal
-            content = content.replace('≠', '\\u2260')  # Not equal
+            content = content.translate(PLANTUML_ESCAPES)
             
         elif diagram_type == 'mermaid':
             # For Mermaid, ensure special characters in labels are quoted
-            content = content.replace('≥', '>=')  # Use standard comparison
-            content = content.replace('≤', '<=')  # Use standard comparison
-            content = content.replace(''', "'")   # Replace smart quotes
-            content = content.replace(''', "'")   # Replace smart quotes
-            content = content.replace('"', '"')   # Replace smart quotes
-            content = content.replace('"', '"')   # Replace smart quotes
+            content = content.translate(MERMAID_ESCAPES)
             
         return content
 
@@ -364,7 +430,7 @@ class KrokiDebugger:
             # Find where the actual diagram starts (after @startuml or diagram type)
             actual_start = 0
             for i, line in enumerate(lines):
-                if line.strip().startswith('@start') or any(line.strip().startswith(t) for t in ['flowchart', 'graph', 'sequenceDiagram']):
+                if line.strip().startswith(DIAGRAM_BODY_STARTS):
                     actual_start = i
                     break
             if actual_start > 0:
@@ -396,8 +462,7 @@ class KrokiDebugger:
                 first_line = lines[0].strip()
                 
                 # Try to detect diagram type and add it
-                if not any(first_line.startswith(start) for start in 
-                          ['graph', 'flowchart', 'sequenceDiagram', 'classDiagram']):
+                if not first_line.startswith(MERMAID_FIXABLE_STARTS):
                     # Simple heuristic: if it has arrows, it's probably a flowchart
                     if '-->' in content or '->' in content:
                         return f"flowchart TD\n{content}"
@@ -420,20 +485,18 @@ class KrokiDebugger:
             with open(diagram.file_path, 'r', encoding='utf-8') as f:
                 file_content = f.read()
             
-            original_content = file_content
-            lines = file_content.split('\n')
-            
-            # Replace the content between start_line and end_line
-            new_lines = lines[:diagram.start_line]  # Before diagram
-            new_lines.append(f"```kroki-{diagram.diagram_type}")
-            new_lines.append(fixed_content)
-            new_lines.append("```")
-            new_lines.extend(lines[diagram.end_line:])  # After diagram
+            span = self._find_block_span(diagram, file_content)
+            if span is None:
+                print(f"❌ Diagram no longer found in {diagram.file_path}")
+                return False
             
-            new_content = '\n'.join(new_lines)
+            # Splice the fixed block over the original one
+            start, end = span
+            new_block = f"```kroki-{diagram.diagram_type}\n{fixed_content}\n```"
+            new_content = file_content[:start] + new_block + file_content[end:]
             
             # Only write if content actually changed
-            if new_content != original_content:
+            if new_content != file_content:
                 with open(diagram.file_path, 'w', encoding='utf-8') as f:
                     f.write(new_content)
                 print(f"✅ Applied fix to {diagram.file_path}")
@@ -446,6 +509,21 @@ class KrokiDebugger:
             print(f"❌ Error applying fix: {e}")
             return False
 
+    def _find_block_span(self, diagram: KrokiDiagram, file_content: str) -> Optional[Tuple[int, int]]:
+        """Locate the diagram's fenced block in the current file content.
+
+        The offsets recorded by _scan_file are used when they still point at
+        the same block; otherwise (e.g. an earlier fix in the same file moved
+        it) the first block with the same content is used.
+        """
+        match = KROKI_BLOCK_RE.match(file_content, diagram.start_offset) if diagram.start_offset >= 0 else None
+        if match and match.end() == diagram.end_offset and match.group(2) == diagram.content:
+            return match.span()
+        for match in KROKI_BLOCK_RE.finditer(file_content):
+            if match.group(2) == diagram.content and match.group(1).lower() == diagram.diagram_type:
+                return match.span()
+        return None
+
     def _validate_fix(self, diagram: KrokiDiagram, fixed_content: str) -> bool:
         """Validate that the fix actually works by testing the fixed content."""
         # Create a temporary diagram object with the fixed content
@@ -469,6 +547,94 @@ class KrokiDebugger:
                 print(f"   • {issue}")
             return False
 
+    def write_fix_plan(self, broken_diagrams: List[KrokiDiagram], plan_path: str) -> int:
+        """Write the suggested fixes to a JSON plan for review and apply_fix_plan.
+
+        The plan maps each file to its edits. Each fix is validated as with
+        --auto-fix and the result stored, so apply_fix_plan can skip failures.
+        Returns the number of fixes written.
+        """
+        plan: Dict[str, List[dict]] = {}
+        for diagram in broken_diagrams:
+            fix = self._suggest_fix(diagram)
+            if fix is None:
+                continue
+            print(f"\n🧪 {diagram.file_path}:{diagram.start_line}")
+            validated = self._validate_fix(diagram, fix)
+            plan.setdefault(diagram.file_path, []).append({
+                "diagram_type": diagram.diagram_type,
+                "start_line": diagram.start_line,
+                "end_line": diagram.end_line,
+                "start_offset": diagram.start_offset,
+                "end_offset": diagram.end_offset,
+                "content": diagram.content,
+                "fixed_content": fix,
+                "validated": validated,
+            })
+        
+        with open(plan_path, 'w', encoding='utf-8') as f:
+            json.dump(plan, f, indent=2, ensure_ascii=False)
+        
+        total = sum(len(edits) for edits in plan.values())
+        passed = sum(edit["validated"] for edits in plan.values() for edit in edits)
+        print(f"\n📝 Wrote {total} suggested fixes ({passed} validated) for {len(plan)} files to {plan_path}")
+        return total
+
+    def apply_fix_plan(self, plan_path: str) -> int:
+        """Apply a plan written by write_fix_plan, reading and writing each file once.
+
+        Returns the number of fixes applied.
+        """
+        with open(plan_path, 'r', encoding='utf-8') as f:
+            plan = json.load(f)
+        
+        applied = 0
+        for file_path, edits in plan.items():
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    file_content = f.read()
+            except OSError as e:
+                print(f"❌ Error reading {file_path}: {e}")
+                continue
+            
+            # Splice from the end of the file backwards so earlier offsets stay valid
+            new_content = file_content
+            file_applied = 0
+            for edit in sorted(edits, key=lambda e: e["start_offset"], reverse=True):
+                if not edit.get("validated"):
+                    print(f"⏭️  Fix for line {edit['start_line']} of {file_path} failed validation, skipping")
+                    continue
+                diagram = KrokiDiagram(
+                    file_path=file_path,
+                    diagram_type=edit["diagram_type"],
+                    content=edit["content"],
+                    start_line=edit["start_line"],
+                    end_line=edit["end_line"],
+                    start_offset=edit["start_offset"],
+                    end_offset=edit["end_offset"]
+                )
+                span = self._find_block_span(diagram, new_content)
+                if span is None:
+                    print(f"⚠️  Diagram at line {diagram.start_line} of {file_path} has changed, skipping")
+                    continue
+                start, end = span
+                new_block = f"```kroki-{diagram.diagram_type}\n{edit['fixed_content']}\n```"
+                new_content = new_content[:start] + new_block + new_content[end:]
+                file_applied += 1
+            
+            if new_content != file_content:
+                # Write to a sibling temp file and swap it in so an interrupted run can't truncate the page
+                tmp_path = file_path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(new_content)
+                os.replace(tmp_path, file_path)
+                print(f"✅ Applied {file_applied} fixes to {file_path}")
+                applied += file_applied
+        
+        self.fixes_applied += applied
+        print(f"\n🎯 Applied {applied} fixes from {plan_path}")
+        return applied
+
     def generate_report(self, broken_diagrams: List[KrokiDiagram]):
         """Generate a summary report."""
         print(f"\n{'='*60}")
@@ -497,6 +663,8 @@ def main():
     parser.add_argument("--non-interactive", action="store_true", help="Run without user interaction")
     parser.add_argument("--auto-fix", action="store_true", help="Automatically apply all fixes")
     parser.add_argument("--max-issues", type=int, default=5, help="Maximum number of issues to show per run (default: 5)")
+    parser.add_argument("--plan", metavar="PATH", help="Write suggested fixes for all issues to a JSON plan instead of presenting them")
+    parser.add_argument("--apply-plan", metavar="PATH", help="Apply a JSON plan written by --plan, then exit")
     
     args = parser.parse_args()
     
@@ -505,6 +673,10 @@ def main():
     
     debugger = KrokiDebugger(args.docs_dir, args.kroki_url)
     
+    if args.apply_plan:
+        debugger.apply_fix_plan(args.apply_plan)
+        return
+    
     # Find all diagrams
     all_diagrams = debugger.find_all_diagrams()
     if not all_diagrams:
@@ -514,6 +686,11 @@ def main():
     # Validate diagrams
     broken_diagrams = debugger.validate_diagrams()
     
+    if args.plan:
+        debugger.write_fix_plan(broken_diagrams, args.plan)
+        debugger.generate_report(broken_diagrams)
+        return
+    
     # Limit the number of issues to process
     if len(broken_diagrams) > args.max_issues:
         print(f"\n📊 Found {len(broken_diagrams)} issues total, showing first {args.max_issues}")
@@ -25,17 +25,31 @@ has issues (network problems, API errors, etc.).
 """
 
 import hashlib
+import os
+import re
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from typing import List, Set
 import requests
 
+# One `git diff --name-status` line for an HTML page we may report:
+# status letter (A/D/M/R, optionally with a similarity score), an optional
+# source path for renames, then the path of the page in the new tree.
+NAME_STATUS_RE = re.compile(
+    r'^([ADMR])[^\t\n]*\t(?:[^\t\n]*\t)?([^\t\n]+\.html)$',
+    re.MULTILINE
+)
+
 
 class IndexNowNotifier:
     """Handles IndexNow API submissions for changed pages only."""
     
     INDEXNOW_ENDPOINT = "https://api.indexnow.org/indexnow"
+    # The API rejects requests listing more URLs than this
+    MAX_URLS_PER_REQUEST = 10000
     
     def __init__(self, site_url: str, key_location: str = "docs"):
         """
@@ -47,11 +61,13 @@ class IndexNowNotifier:
         """
         self.site_url = site_url.rstrip('/')
         self.key_location = Path(key_location)
+        # The key file is named after this hash; it is needed for every request
+        self.site_hash = hashlib.md5(self.site_url.encode()).hexdigest()
         self.api_key = self._load_api_key()
         
     def _load_api_key(self) -> str:
         """Load the existing API key from file."""
-        key_file = self.key_location / f"{hashlib.md5(self.site_url.encode()).hexdigest()}.txt"
+        key_file = self.key_location / f"{self.site_hash}.txt"
         
         if not key_file.exists():
             raise FileNotFoundError(
@@ -112,28 +128,16 @@ class IndexNowNotifier:
             changed_files = set()
             deleted_files = set()
             
-            for line in result.stdout.strip().split('\n'):
-                if not line:
-                    continue
-                    
-                parts = line.split('\t', 1)
-                if len(parts) != 2:
-                    continue
-                    
-                status, filepath = parts
-                
-                # Only process HTML files (skip assets, CSS, JS, etc.)
-                if not filepath.endswith('.html'):
-                    continue
-                
+            # Only HTML files match (assets, CSS, JS, etc. are skipped)
+            for status, filepath in NAME_STATUS_RE.findall(result.stdout):
                 # Skip search index and other non-content HTML
                 if any(skip in filepath for skip in ['search/', '404.html', 'sitemap.xml']):
                     continue
                 
                 # D = deleted, A = added, M = modified, R = renamed
-                if status.startswith('D'):
+                if status == 'D':
                     deleted_files.add(filepath)
-                elif status.startswith(('A', 'M', 'R')):
+                else:
                     changed_files.add(filepath)
             
             return changed_files, deleted_files
@@ -192,19 +196,34 @@ class IndexNowNotifier:
             print("[IndexNow] 🧪 DRY RUN - Skipping actual API submission")
             return True
         
+        print(f"[IndexNow] Submitting {len(urls)} URL(s) to IndexNow API...")
+        for url in urls:
+            print(f"  - {url}")
+        
+        size = self.MAX_URLS_PER_REQUEST
+        batches = [urls[i:i + size] for i in range(0, len(urls), size)]
+        
+        # One session keeps the TLS connection alive across batches
+        with requests.Session() as session:
+            if len(batches) == 1:
+                results = [self._submit_batch(session, batches[0])]
+            else:
+                with ThreadPoolExecutor(max_workers=min(4, len(batches))) as pool:
+                    results = list(pool.map(partial(self._submit_batch, session), batches))
+        
+        return all(results)
+    
+    def _submit_batch(self, session: requests.Session, urls: List[str]) -> bool:
+        """Submit one batch of at most MAX_URLS_PER_REQUEST URLs."""
         payload = {
             "host": self.site_url.replace('https://', '').replace('http://', ''),
             "key": self.api_key,
-            "keyLocation": f"{self.site_url}/{hashlib.md5(self.site_url.encode()).hexdigest()}.txt",
+            "keyLocation": f"{self.site_url}/{self.site_hash}.txt",
             "urlList": urls
         }
         
         try:
-            print(f"[IndexNow] Submitting {len(urls)} URL(s) to IndexNow API...")
-            for url in urls:
-                print(f"  - {url}")
-            
-            response = requests.post(
+            response = session.post(
                 self.INDEXNOW_ENDPOINT,
                 json=payload,
                 headers={"Content-Type": "application/json; charset=utf-8"},
@@ -276,8 +295,6 @@ class IndexNowNotifier:
 
 def main():
     """Main entry point for the script."""
-    import os
-    
     # Configuration
     SITE_URL = "https://eatham532.github.io/Software-Engineering-HSC-Textbook/"
     KEY_LOCATION = "docs"
@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 """Comprehensive markdown quality checker for the textbook project."""
+from collections import defaultdict
 from pathlib import Path
 import re
 
+from _common import H1_RE, LIST_ITEM_RE
+
 # Ensure UTF-8 output on Windows
 try:
     # Try to set UTF-8 encoding for Windows console
@@ -13,6 +16,9 @@ except Exception:
 repo = Path(__file__).resolve().parents[1]
 md_files = list(repo.glob('docs/**/*.md'))
 
+# Line patterns, compiled once for every line of every file
+HEADING_RE = re.compile(r'^(#{1,6})\s')
+
 def check_file(p: Path):
     """Check a single markdown file for common issues."""
     try:
@@ -25,9 +31,12 @@ def check_file(p: Path):
     issues = []
     in_fence = False
     h1_count = 0
+    last = len(lines) - 1
+    prev_blank = True  # the start of the file counts as a blank line
 
     for i, line in enumerate(lines):
         stripped = line.lstrip()
+        above_blank, prev_blank = prev_blank, not stripped
 
         # Track code fences
         if stripped.startswith('```'):
@@ -38,21 +47,21 @@ def check_file(p: Path):
             continue
 
         # Count H1 headings
-        if re.match(r'^#\s', stripped):
+        if H1_RE.match(stripped):
             h1_count += 1
 
         # Check heading spacing
-        if re.match(r'^(#{1,6})\s', stripped):
+        if HEADING_RE.match(stripped):
             # Check line before
-            if i > 0 and lines[i-1].strip() != '':
+            if not above_blank:
                 issues.append(f"  - Line {i+1}: heading '{line[:50]}...' not preceded by a blank line")
             # Check line after
-            if i < len(lines) - 1 and lines[i+1].strip() != '':
+            if i < last and lines[i+1].strip():
                 issues.append(f"  - Line {i+1}: heading '{line[:50]}...' not followed by a blank line")
 
         # Check list item spacing
-        if re.match(r'^([-*+]\s|\d+\.\s)', stripped):
-            if i > 0 and lines[i-1].strip() != '':
+        if LIST_ITEM_RE.match(stripped):
+            if not above_blank:
                 issues.append(f"  - Line {i+1}: list item may need a blank line before it ('{line[:50]}...')")
 
     # Check H1 count
@@ -96,13 +105,10 @@ def check_files_overview():
     print(f"📄 Total markdown files: {len(md_files)}")
 
     # Group by directory
-    dirs = {}
+    dirs = defaultdict(list)
     for f in md_files:
         rel_path = f.relative_to(repo / 'docs')
-        dir_name = str(rel_path.parent)
-        if dir_name not in dirs:
-            dirs[dir_name] = []
-        dirs[dir_name].append(f)
+        dirs[str(rel_path.parent)].append(f)
 
     print("\n📁 Files by directory:")
     for dir_name, files in sorted(dirs.items()):
@@ -12,6 +12,16 @@ import re
 from pathlib import Path
 from typing import Optional
 
+from _common import iter_markdown_files
+
+
+TITLE_RE = re.compile(r'^title:\s*(.+)$', re.MULTILINE)
+# First "# Header" line (indentation allowed); group 1 is the stripped header text
+H1_RE = re.compile(r'^[^\S\n]*# [^\S\n]*(\S[^\n]*?)[^\S\n]*$', re.MULTILINE)
+# Frontmatter delimiter lines; surrounding whitespace is ignored
+FRONTMATTER_OPEN_RE = re.compile(r'[^\S\n]*---[^\S\n]*(?:\n|\Z)')
+FRONTMATTER_CLOSE_RE = re.compile(r'\n[^\S\n]*---[^\S\n]*(?=\n|\Z)')
+
 
 def extract_first_header(content: str) -> Optional[str]:
     """
@@ -19,27 +29,20 @@ def extract_first_header(content: str) -> Optional[str]:
 
     Returns the header text without the # prefix, or None if no header found.
     """
-    lines = content.split('\n')
-
-    for line in lines:
-        line = line.strip()
-        # Look for H1 headers: # Header text
-        if line.startswith('# ') and len(line) > 2:
-            # Remove the # and any trailing whitespace
-            header_text = line[2:].strip()
-            return header_text
-
-    return None
+    match = H1_RE.search(content)
+    return match.group(1) if match else None
 
 
 def has_frontmatter(content: str) -> bool:
     """
     Check if the file already has YAML frontmatter.
     """
-    lines = content.split('\n')
-    if len(lines) >= 2:
-        return lines[0].strip() == '---' and '---' in lines[1:]
-    return False
+    first_line = FRONTMATTER_OPEN_RE.match(content)
+    if not first_line or first_line.end() == len(content):
+        return False
+    # A line that is exactly --- somewhere after the opening one
+    rest = content[first_line.end() - 1:]
+    return '\n---\n' in rest or rest.endswith('\n---')
 
 
 def extract_frontmatter(content: str) -> tuple[str, str]:
@@ -52,21 +55,15 @@ def extract_frontmatter(content: str) -> tuple[str, str]:
     if not has_frontmatter(content):
         return '', content
 
-    lines = content.split('\n')
-    frontmatter_end = -1
-
-    # Find the closing ---
-    for i, line in enumerate(lines[1:], 1):
-        if line.strip() == '---':
-            frontmatter_end = i
-            break
+    # Find the closing --- (starting from the newline that ends the opening line)
+    closing = FRONTMATTER_CLOSE_RE.search(content, content.index('\n'))
 
-    if frontmatter_end == -1:
+    if not closing:
         # Malformed frontmatter, treat as no frontmatter
         return '', content
 
-    frontmatter = '\n'.join(lines[:frontmatter_end + 1]) + '\n'
-    body = '\n'.join(lines[frontmatter_end + 1:])
+    frontmatter = content[:closing.end()] + '\n'
+    body = content[closing.end() + 1:]
 
     return frontmatter, body
 
@@ -80,8 +77,7 @@ def update_frontmatter_title(frontmatter: str, title: str) -> str:
         return f'---\ntitle: "{title}"\n---\n\n'
 
     # Check if title already exists
-    title_pattern = re.compile(r'^title:\s*(.+)$', re.MULTILINE)
-    match = title_pattern.search(frontmatter)
+    match = TITLE_RE.search(frontmatter)
 
     if match:
         # Replace existing title
@@ -160,7 +156,7 @@ def main():
         return 1
 
     # Find all .md files in docs/
-    md_files = list(docs_dir.rglob("*.md"))
+    md_files = list(iter_markdown_files(docs_dir))
 
     if not md_files:
         print("No .md files found in docs/")
@@ -9,11 +9,20 @@
 
 This is conservative: it preserves code fences and won't touch lines inside them.
 """
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import io
+import os
 import re
 
+from _common import H1_RE, LIST_ITEM_RE, iter_markdown_files
+
 repo = Path(__file__).resolve().parents[1]
-md_files = list(repo.glob('**/*.md'))
+
+# Patterns are compiled once rather than on every line
+HEADING_RE = re.compile(r'^(#{2,})\s')
+LABEL_VALUE_RE = re.compile(r"^\*\*[^*]+\*\*\s*:\s*")
+INDENT_RE = re.compile(r' *')
 
 def fix_file(p: Path):
     text = p.read_text(encoding='utf-8')
@@ -27,7 +36,7 @@ def fix_file(p: Path):
     def is_label_value(s: str) -> bool:
         stripped = s.lstrip()
         # Match **Something**: followed by space or end
-        return re.match(r"^\*\*[^*]+\*\*\s*:\s*", stripped) is not None
+        return LABEL_VALUE_RE.match(stripped) is not None
     while i < len(lines):
         line = lines[i]
         stripped = line.lstrip()
@@ -51,39 +60,38 @@ def fix_file(p: Path):
         if stripped.startswith('!!!'):
             out.append(line)  # keep admonition marker as-is
             i += 1
-            # collect consecutive lines that belong to the admonition (blank or indented)
+            # collect consecutive lines that belong to the admonition (blank or indented),
+            # noting the original base indent from the first non-empty line as we go
             block_lines = []
+            orig_base = None
             while i < len(lines):
                 nxt = lines[i]
-                if nxt.strip() == '' or (len(nxt) > 0 and nxt[0].isspace()):
-                    block_lines.append(nxt)
-                    i += 1
-                    continue
-                break
-            # determine original base indent from first non-empty block line
-            orig_base = None
-            for bl in block_lines:
-                if bl.strip() != '':
-                    bl_exp = bl.expandtabs(4)
-                    leading = len(bl_exp) - len(bl_exp.lstrip(' '))
-                    orig_base = leading
+                # isspace() tests blankness without building a stripped copy
+                if not nxt or nxt.isspace():
+                    block_lines.append(None)
+                elif nxt[0].isspace():
+                    bl_exp = nxt.expandtabs(4)
+                    leading = INDENT_RE.match(bl_exp).end()
+                    if orig_base is None:
+                        orig_base = leading
+                    block_lines.append((leading, bl_exp))
+                else:
                     break
+                i += 1
             # normalize: map orig_base -> 4 spaces, preserve relative deeper indents
             for bl in block_lines:
-                if bl.strip() == '':
+                if bl is None:
                     out.append('')
                     continue
-                bl_exp = bl.expandtabs(4)
-                leading = len(bl_exp) - len(bl_exp.lstrip(' '))
-                rel = leading - orig_base if orig_base is not None else leading
+                leading, bl_exp = bl
+                rel = leading - orig_base
                 if rel < 0:
                     rel = 0
                 new_lead = 4 + rel
-                content = bl_exp.lstrip(' ')
-                out.append(' ' * new_lead + content)
+                out.append(' ' * new_lead + bl_exp[leading:])
             continue
         # H1 handling
-        if re.match(r'^#\s', stripped):
+        if H1_RE.match(stripped):
             if not first_h1_seen:
                 first_h1_seen = True
                 # ensure blank line above
@@ -111,7 +119,7 @@ def fix_file(p: Path):
                 i += 1
                 continue
         # heading other levels ensure blank lines
-        if re.match(r'^(#{2,})\s', stripped):
+        if HEADING_RE.match(stripped):
             if out and out[-1].strip() != '':
                 out.append('')
             out.append(line)
@@ -121,7 +129,7 @@ def fix_file(p: Path):
             i += 1
             continue
         # list item: if previous output line not blank, insert blank
-        if re.match(r'^([-*+]\s|\d+\.\s)', stripped):
+        if LIST_ITEM_RE.match(stripped):
             if out and out[-1].strip() != '':
                 out.append('')
             out.append(line)
@@ -143,17 +151,34 @@ def fix_file(p: Path):
     while out and out[-1].strip() == '':
         out.pop()
 
-    # Ensure file ends with exactly one final newline (no extra blank lines)
-    body = '\n'.join(out).rstrip('\n')
-    new_text = body + '\n'
+    # Ensure file ends with exactly one final newline (no extra blank lines),
+    # writing each line into a buffer instead of joining one large list
+    buf = io.StringIO()
+    for line in out:
+        buf.write(line)
+        buf.write('\n')
+    new_text = buf.getvalue() or '\n'
     if new_text != text:
-        p.write_text(new_text, encoding='utf-8')
+        # Write to a sibling temp file and swap it in so a failed write can't truncate the page
+        tmp_path = p.with_suffix(p.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(new_text)
+        os.replace(tmp_path, p)
         return True
     return False
 
-fixed = 0
-for f in sorted(md_files):
-    if fix_file(f):
-        print(f'Fixed: {f.relative_to(repo)}')
-        fixed += 1
-print(f'Done. Files fixed: {fixed}')
+def main():
+    md_files = sorted(iter_markdown_files(repo))
+    # Files are independent, so fan them out across cores; results come back in
+    # input order and are reported from the main process
+    with ProcessPoolExecutor() as ex:
+        results = list(ex.map(fix_file, md_files, chunksize=8))
+    fixed = 0
+    for f, changed in zip(md_files, results):
+        if changed:
+            print(f'Fixed: {f.relative_to(repo)}')
+            fixed += 1
+    print(f'Done. Files fixed: {fixed}')
+
+if __name__ == '__main__':
+    main()
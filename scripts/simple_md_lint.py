@@ -8,26 +8,29 @@ Writes a short report to stdout.
 import sys
 from pathlib import Path
 
+from _common import iter_markdown_files
+
 def check_file(p: Path):
     lines = p.read_text(encoding='utf-8').splitlines()
     h1_count = 0
     issues = []
+    last = len(lines) - 1
+    prev_blank = True  # the start of the file counts as a blank line
     for i, line in enumerate(lines):
         stripped = line.lstrip()
+        above_empty, prev_blank = prev_blank, not stripped
         # H1 count
         if stripped.startswith('# '):
             h1_count += 1
         # heading spacing (requires blank line above and below)
         if stripped.startswith('#'):
-            above_empty = (i == 0) or (lines[i-1].strip() == '')
-            below_empty = (i == len(lines)-1) or (lines[i+1].strip() == '')
+            below_empty = (i == last) or not lines[i+1].strip()
             if not above_empty:
                 issues.append(f"Line {i+1}: heading '{stripped[:60]}' not preceded by a blank line")
             if not below_empty:
                 issues.append(f"Line {i+1}: heading '{stripped[:60]}' not followed by a blank line")
         # list spacing: detect list item starts
         if stripped.startswith(('- ', '* ', '+ ')) or (stripped[:2].isdigit() and stripped[2:4] == '. '):
-            above_empty = (i == 0) or (lines[i-1].strip() == '')
             if not above_empty:
                 issues.append(f"Line {i+1}: list item may need a blank line before it ('{stripped[:60]}')")
     return h1_count, issues
@@ -35,7 +38,7 @@ def check_file(p: Path):
 
 def main():
     repo = Path(__file__).resolve().parents[1]
-    md_files = list(repo.glob('**/*.md'))
+    md_files = list(iter_markdown_files(repo))
     if not md_files:
         print('No markdown files found.')
         return 0